@@ -0,0 +1,113 @@
+"""Замеры производительности коллекции рецептов
+
+Запуск:
+    python benchmark.py memory [--sizes 100000 1000000 10000000]
+    python benchmark.py load-many [--files 32] [--rows 100000] [--workers 1 2 4 8]
+"""
+import argparse
+import contextlib
+import gc
+import io
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from lab1 import ColumnarRecipeList, RecipeCollection
+
+DIFFICULTIES = ["лёгкий", "средний", "сложный"]
+
+
+def fill_collection(collection: RecipeCollection, n: int):
+    """Заполнение коллекции синтетическими рецептами (как при чтении файла — новые строки)"""
+    recipes = collection.recipes
+    if isinstance(recipes, ColumnarRecipeList):
+        add = recipes.add
+    else:
+        recipe_cls = collection.recipe_cls
+
+        def add(*fields):
+            recipes.append(recipe_cls(*fields))
+
+    for i in range(n):
+        add(f"Блюдо №{i % 50000}", f"Автор {i % 200}", 5 + i % 295, DIFFICULTIES[i % 3])
+
+
+def _max_rss_bytes() -> int:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def _measure_memory(storage: str, n: int):
+    """Выполняется в отдельном процессе: прирост пикового RSS и время заполнения"""
+    gc.collect()
+    before = _max_rss_bytes()
+    collection = RecipeCollection(storage)
+    start = time.perf_counter()
+    fill_collection(collection, n)
+    elapsed = time.perf_counter() - start
+    return _max_rss_bytes() - before, elapsed
+
+
+def bench_memory(sizes):
+    print(f"{'Строк':>10}  {'Хранилище':<10}  {'Память, МБ':>11}  {'Байт/строку':>12}  {'Время, с':>9}")
+    print("─" * 60)
+    for n in sizes:
+        for storage in RecipeCollection.STORAGES:
+            # Новый процесс на каждый замер — чтобы пиковый RSS не копился
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                used, elapsed = pool.submit(_measure_memory, storage, n).result()
+            print(f"{n:>10}  {storage:<10}  {used / 2**20:>11.1f}  {used / n:>12.1f}  {elapsed:>9.2f}")
+
+
+def bench_load_many(files: int, rows: int, workers_list):
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for k in range(files):
+            shard = RecipeCollection("columnar")
+            fill_collection(shard, rows)
+            path = os.path.join(tmp, f"shard_{k:03}.txt")
+            with contextlib.redirect_stdout(io.StringIO()):
+                shard.save_to_text(path)
+            paths.append(path)
+
+        total = files * rows
+        print(f"{files} файлов × {rows} строк = {total} рецептов")
+        print(f"{'Процессов':>9}  {'Время, с':>9}  {'Строк/с':>12}  {'Ускорение':>9}")
+        print("─" * 46)
+        baseline = None
+        for workers in workers_list:
+            collection = RecipeCollection("columnar")
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                collection.load_many(paths, workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers:>9}  {elapsed:>9.2f}  {total / elapsed:>12,.0f}  {baseline / elapsed:>8.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки коллекции рецептов")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    memory = commands.add_parser("memory", help="память list / slots / columnar")
+    memory.add_argument("--sizes", type=int, nargs="+", default=[10**5, 10**6, 10**7])
+
+    load_many = commands.add_parser("load-many", help="масштабирование load_many по процессам")
+    load_many.add_argument("--files", type=int, default=32)
+    load_many.add_argument("--rows", type=int, default=100000, help="строк в каждом файле")
+    load_many.add_argument("--workers", type=int, nargs="+",
+                           default=sorted({1, 2, 4, 8, os.cpu_count() or 1}))
+
+    args = parser.parse_args()
+    if args.command == "memory":
+        bench_memory(args.sizes)
+    elif args.command == "load-many":
+        bench_load_many(args.files, args.rows, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,79 @@
-from typing import List
-from dataclasses import dataclass
+import argparse
+import contextlib
+import io
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from heapq import merge
+from itertools import chain, islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, TextIO, Tuple, Union
+from dataclasses import dataclass, field
 
 
-@dataclass
-class Recipe:
-    """Один рецепт в личной кулинарной книге"""
-    dish_name: str          # название блюда
-    source: str             # автор/сайт/книга
-    prep_time: int          # время приготовления в минутах
-    difficulty: str = "Средний"  # лёгкий / средний / сложный
+# Поле строки файла: символы кроме «|» и «\», экранированные «\\» и «\|»
+# или одиночная «\» (в файлах, записанных до экранирования «\», она стоит
+# как есть); поля разделены «|»
+_FIELD = re.compile(r'(?:[^|\\]|\\[\\|]|\\(?![\\|]))*')
+_ESCAPED = re.compile(r'\\([\\|])')
+
+# Допустимое время приготовления: одинаково для всех хранилищ и влезает в
+# int32 бинарного формата
+MAX_PREP_TIME = 2**31 - 1
+
+
+def _escape_field(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('|', '\\|')
+
+
+def _split_fields(line: str) -> List[str]:
+    """Поля строки файла без экранирования"""
+    if '\\' not in line:
+        return line.split('|')
+    fields = []
+    pos = 0
+    while True:
+        match = _FIELD.match(line, pos)
+        fields.append(_ESCAPED.sub(r'\1', match.group()))
+        pos = match.end() + 1  # за полем — «|» или конец строки
+        if pos > len(line):
+            return fields
+
+
+class RecipeFormat:
+    """Общие методы рецепта: запись в файл, чтение из файла, вывод"""
+    __slots__ = ()
 
     def to_txt_line(self) -> str:
         """Рецепт → строка для текстового файла"""
-        safe_dish   = self.dish_name.replace('|', '\\|')
-        safe_source = self.source.replace('|', '\\|')
-        safe_diff   = self.difficulty.replace('|', '\\|')
+        safe_dish   = _escape_field(self.dish_name)
+        safe_source = _escape_field(self.source)
+        safe_diff   = _escape_field(self.difficulty)
         return f"{safe_dish}|{safe_source}|{self.prep_time}|{safe_diff}\n"
 
     @classmethod
     def from_txt_line(cls, line: str) -> 'Recipe':
         """Строка из файла → объект Recipe"""
-        parts = line.strip().split('|')
+        parts = _split_fields(line.strip())
         if len(parts) < 3:
             raise ValueError(f"Неверный формат строки: {line.strip()}")
 
-        dish_name = parts[0].replace('\\|', '|')
-        source    = parts[1].replace('\\|', '|')
+        dish_name = parts[0]
+        source    = parts[1]
         try:
             prep_time = int(parts[2])
         except ValueError:
             raise ValueError(f"Время приготовления не число: {parts[2]}")
+        if not 0 <= prep_time <= MAX_PREP_TIME:
+            raise ValueError(f"Время приготовления вне допустимого диапазона: {prep_time}")
 
-        difficulty = parts[3].replace('\\|', '|') if len(parts) > 3 else "Средний"
+        difficulty = parts[3] if len(parts) > 3 else "Средний"
 
         return cls(dish_name, source, prep_time, difficulty)
 
@@ -39,14 +81,912 @@ class Recipe:
         return f"«{self.dish_name}» — {self.source} ({self.prep_time} мин), сложность: {self.difficulty}"
 
 
-class RecipeCollection:
-    """Управление личной коллекцией рецептов"""
+@dataclass
+class Recipe(RecipeFormat):
+    """Один рецепт в личной кулинарной книге"""
+    dish_name: str          # название блюда
+    source: str             # автор/сайт/книга
+    prep_time: int          # время приготовления в минутах
+    difficulty: str = "Средний"  # лёгкий / средний / сложный
+
+
+@dataclass(slots=True)
+class SlottedRecipe(RecipeFormat):
+    """Компактный рецепт без __dict__ (для больших коллекций)"""
+    dish_name: str
+    source: str
+    prep_time: int
+    difficulty: str = "Средний"
+
+
+class _CodedColumn:
+    """Строковый столбец со словарным кодированием: коды в array('I') + словарь значений"""
+    __slots__ = ("codes", "values", "_codes_by_value")
+
+    def __init__(self):
+        self.codes = array('I')
+        self.values: List[str] = []
+        self._codes_by_value: Dict[str, int] = {}
+
+    def append(self, value: str):
+        code = self._codes_by_value.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(sys.intern(value))
+            self._codes_by_value[self.values[code]] = code
+        self.codes.append(code)
+
+    def ranks(self, key: Callable[[str], Any]) -> List[int]:
+        """Ранг каждого значения словаря по key (равные ключи — равный ранг);
+        key считается один раз на значение, а не на строку"""
+        keyed = [key(v) for v in self.values]
+        ranks = [0] * len(keyed)
+        rank, previous = -1, None
+        for code in sorted(range(len(keyed)), key=keyed.__getitem__):
+            if rank < 0 or keyed[code] != previous:
+                rank, previous = rank + 1, keyed[code]
+            ranks[code] = rank
+        return ranks
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            values = self.values
+            return [values[c] for c in self.codes[i]]
+        return self.values[self.codes[i]]
+
+    def __iter__(self) -> Iterator[str]:
+        values = self.values
+        return (values[c] for c in self.codes)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+class ColumnarRecipeList:
+    """Колоночное хранилище рецептов с интерфейсом списка.
+
+    Названия блюд хранятся списком интернированных строк, источник и сложность —
+    словарно-кодированными столбцами, время — в array('I'). Объекты Recipe
+    создаются только при обращении к строке и являются копиями: их изменение
+    не попадает в хранилище.
+    """
+    MAX_PREP_TIME = MAX_PREP_TIME
+
+    def __init__(self, recipes: Iterable[RecipeFormat] = ()):
+        self.dish_names: List[str] = []
+        self.sources = _CodedColumn()
+        self.difficulties = _CodedColumn()
+        self.prep_times = array('I')
+        self.extend(recipes)
+
+    def add(self, dish_name: str, source: str, prep_time: int, difficulty: str):
+        if not 0 <= prep_time <= self.MAX_PREP_TIME:
+            raise ValueError(f"Время приготовления вне допустимого диапазона: {prep_time}")
+        self.prep_times.append(prep_time)
+        self.dish_names.append(sys.intern(dish_name))
+        self.sources.append(source)
+        self.difficulties.append(difficulty)
+
+    def append(self, recipe: RecipeFormat):
+        self.add(recipe.dish_name, recipe.source, recipe.prep_time, recipe.difficulty)
+
+    def extend(self, recipes: Iterable[RecipeFormat]):
+        for recipe in recipes:
+            self.add(recipe.dish_name, recipe.source, recipe.prep_time, recipe.difficulty)
+
+    def column(self, field: str) -> Iterable:
+        """Значения одного поля без создания объектов Recipe"""
+        return {"dish_name": self.dish_names, "source": self.sources,
+                "prep_time": self.prep_times, "difficulty": self.difficulties}[field]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return Recipe(self.dish_names[i], self.sources[i], self.prep_times[i], self.difficulties[i])
+
+    def __iter__(self) -> Iterator[Recipe]:
+        for row in zip(self.dish_names, self.sources, self.prep_times, self.difficulties):
+            yield Recipe(*row)
+
+    def __len__(self) -> int:
+        return len(self.prep_times)
+
+
+DIFFICULTY_ORDER = {"лёгкий": 0, "средний": 1, "сложный": 2}
+
+
+def difficulty_rank(difficulty: str) -> int:
+    return DIFFICULTY_ORDER.get(difficulty.lower(), 1)
+
+
+# Критерий сортировки → (поле рецепта, функция ключа, подпись для сообщений)
+SORT_CRITERIA: Dict[str, Tuple[str, Optional[Callable[[Any], Any]], str]] = {
+    "dish": ("dish_name", str.lower, "названию блюда"),
+    "source": ("source", str.lower, "источнику"),
+    "time": ("prep_time", None, "времени приготовления"),
+    "difficulty": ("difficulty", difficulty_rank, "сложности"),
+}
+
+
+def field_values(recipes: Sequence[RecipeFormat], field: str, start: int = 0) -> Sequence:
+    """Значения поля начиная со строки start (для колонок — без создания Recipe)"""
+    if hasattr(recipes, "column"):
+        return recipes.column(field)[start:]
+    return [getattr(r, field) for r in recipes[start:]]
+
+
+class SortOrderCache:
+    """Кэш ключей сортировки и готовых перестановок по критериям.
+
+    Ключи считаются один раз на строку, перестановки (номера строк в нужном
+    порядке) запоминаются для каждого набора критериев. Дописанные строки
+    вставляются в готовые перестановки бинарным поиском, большая пачка —
+    сливается с ними за один проход. Сортировка устойчива: при равных ключах
+    сохраняется порядок добавления.
+    """
+    # Сколько новых строк вставлять по одной; больше — слияние
+    INSERT_LIMIT = 64
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.keys: Dict[str, Sequence] = {}
+        # Кодированные столбцы: критерий → (размер словаря, ранг по коду значения)
+        self.ranks: Dict[str, Tuple[int, List[int]]] = {}
+        self.orders: Dict[Tuple[str, ...], array] = {}
+
+    def criterion_keys(self, recipes: Sequence[RecipeFormat], criterion: str) -> Sequence:
+        """Ключи сортировки по номерам строк.
+
+        Ключ считается один раз на различное значение. У ColumnarRecipeList
+        кодированные столбцы дают ранги значений (array('I') по кодам строк),
+        столбец времени берётся как есть; у списков рецептов одинаковые
+        значения получают общий объект ключа.
+        """
+        field, key, _ = SORT_CRITERIA[criterion]
+        column = recipes.column(field) if hasattr(recipes, "column") else None
+        if isinstance(column, _CodedColumn):
+            return self._coded_keys(criterion, column, key)
+        if key is None and isinstance(column, array):
+            return column
+        keys = self.keys.setdefault(criterion, [])
+        if len(keys) < len(recipes):
+            values = field_values(recipes, field, len(keys))
+            if key is None:
+                keys.extend(values)
+            else:
+                keyed = {v: key(v) for v in set(values)}
+                keys.extend(map(keyed.__getitem__, values))
+        return keys
+
+    def _coded_keys(self, criterion: str, column: _CodedColumn,
+                    key: Optional[Callable[[str], Any]]) -> array:
+        size, ranks = self.ranks.get(criterion, (0, None))
+        keys = self.keys.get(criterion)
+        if ranks is None or size != len(column.values):
+            # Новое значение словаря может встать между старыми — ранги
+            # пересчитываются (по словарю), ключи строк — заново по кодам
+            ranks = column.ranks(key or (lambda v: v))
+            self.ranks[criterion] = (len(column.values), ranks)
+            keys = None
+        if keys is None:
+            keys = array('I', map(ranks.__getitem__, column.codes))
+        elif len(keys) < len(column):
+            keys.extend(map(ranks.__getitem__, column.codes[len(keys):]))
+        self.keys[criterion] = keys
+        return keys
+
+    def order(self, recipes: Sequence[RecipeFormat], criteria: Tuple[str, ...]) -> array:
+        """Номера строк, упорядоченные по criteria (первый критерий — главный)"""
+        key_lists = [self.criterion_keys(recipes, c) for c in criteria]
+        if len(key_lists) == 1:
+            sort_key = key_lists[0].__getitem__
+        else:
+            def sort_key(i: int) -> tuple:
+                return tuple(keys[i] for keys in key_lists)
+
+        n = len(recipes)
+        order = self.orders.get(criteria)
+        if order is None or len(order) > n:
+            # Полная сортировка — устойчивыми проходами от младшего критерия к
+            # главному: без кортежа ключей на каждую строку
+            rows = list(range(n))
+            for keys in reversed(key_lists):
+                rows.sort(key=keys.__getitem__)
+            order = array('I', rows)
+        elif len(order) < n:
+            new_ids = range(len(order), n)
+            if len(new_ids) <= max(self.INSERT_LIMIT, len(order) >> 6):
+                for i in new_ids:
+                    order.insert(bisect_right(order, sort_key(i), key=sort_key), i)
+            else:
+                order = array('I', merge(order, sorted(new_ids, key=sort_key), key=sort_key))
+        self.orders[criteria] = order
+        return order
+
+
+# Обработчик некорректной строки: (номер строки, строка, ошибка)
+ErrorCallback = Callable[[int, str, ValueError], None]
+
+
+def iter_from_text(filename: str, on_error: Optional[ErrorCallback] = None,
+                   recipe_cls: type = Recipe) -> Iterator[RecipeFormat]:
+    """Ленивое чтение рецептов из текстового файла построчно"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        # Две строки заголовка пропускаются, только если за ними есть данные
+        head = list(islice(f, 3))
+        first_no = 3 if len(head) > 2 else 1
+        data_lines = head[2:] if len(head) > 2 else head
+        for line_no, line in enumerate(chain(data_lines, f), first_no):
+            if not line.strip():
+                continue
+            try:
+                yield recipe_cls.from_txt_line(line)
+            except ValueError as e:
+                if on_error is not None:
+                    on_error(line_no, line.strip(), e)
+
+
+TEXT_HEADER = "БЛЮДО|ИСТОЧНИК|ВРЕМЯ|СЛОЖНОСТЬ\n" + "-" * 70 + "\n"
+
+
+def replace_atomically(filename: str, write: Callable[[Any], None], mode: str = 'w'):
+    """Запись через временный файл, fsync и атомарную замену: при сбое старый файл цел"""
+    tmp_name = filename + ".tmp"
+    try:
+        with open(tmp_name, mode, encoding=None if 'b' in mode else 'utf-8') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, filename)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+        raise
+
+
+def write_text(filename: str, recipes: Iterable[RecipeFormat], header: str = TEXT_HEADER) -> int:
+    """Запись рецептов в текстовый файл с заголовком (атомарно)"""
+    count = 0
+
+    def write(f):
+        nonlocal count
+        f.write(header)
+        for batch in batched(recipes, 10000):
+            f.writelines(recipe.to_txt_line() for recipe in batch)
+            count += len(batch)
+
+    replace_atomically(filename, write)
+    return count
+
+
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    """Разбиение потока на пачки фиксированного размера"""
+    if size < 1:
+        raise ValueError("Размер пачки должен быть положительным")
+    it = iter(items)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def iter_batches_from_text(filename: str, batch_size: int = 10000,
+                           on_error: Optional[ErrorCallback] = None,
+                           recipe_cls: type = Recipe) -> Iterator[List[RecipeFormat]]:
+    """Чтение рецептов из текстового файла пачками по batch_size штук"""
+    return batched(iter_from_text(filename, on_error, recipe_cls), batch_size)
+
+
+# Бинарный формат (little-endian):
+#   заголовок  — магия, версия, число строк, число строк в таблице строк;
+#   столбцы    — dish_id, source_id, difficulty_id (uint32), prep_time (int32) по всем строкам;
+#   смещения   — uint64 на каждую строку таблицы + конец последней;
+#   таблица строк — UTF-8 байты всех уникальных строк подряд.
+BINARY_MAGIC = b"RCPB"
+BINARY_VERSION = 1
+_BINARY_HEADER = struct.Struct("<4sHHQQ")
+_BINARY_HEADER_SIZE = 32
+_BINARY_FIELDS = ("dish_name", "source", "difficulty", "prep_time")
+
+
+def _binary_layout(rows: int, strings: int) -> Tuple[int, int]:
+    """Смещения таблицы смещений строк и самих строк"""
+    offsets_at = _BINARY_HEADER_SIZE + 16 * rows
+    offsets_at += -offsets_at % 8
+    return offsets_at, offsets_at + 8 * (strings + 1)
+
+
+def write_binary(filename: str, recipes: Iterable[RecipeFormat]) -> int:
+    """Запись рецептов в бинарный файл (атомарно)"""
+    ids: Dict[str, int] = {}
+    columns = [array('I'), array('I'), array('I'), array('i')]
+    dish_ids, source_ids, difficulty_ids, prep_times = columns
+    for recipe in recipes:
+        for column, value in ((dish_ids, recipe.dish_name), (source_ids, recipe.source),
+                              (difficulty_ids, recipe.difficulty)):
+            column.append(ids.setdefault(value, len(ids)))
+        try:
+            prep_times.append(recipe.prep_time)
+        except OverflowError:
+            raise ValueError(f"Время приготовления вне допустимого диапазона: {recipe.prep_time}")
+
+    encoded = [value.encode('utf-8') for value in ids]
+    offsets = array('Q', [0])
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    if sys.byteorder != "little":
+        for column in (*columns, offsets):
+            column.byteswap()
+
+    rows = len(prep_times)
+    offsets_at, _ = _binary_layout(rows, len(encoded))
+
+    def write(f):
+        f.write(_BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, 0, rows, len(encoded)))
+        f.write(bytes(_BINARY_HEADER_SIZE - _BINARY_HEADER.size))
+        for column in columns:
+            column.tofile(f)
+        f.write(bytes(offsets_at - f.tell()))
+        offsets.tofile(f)
+        f.writelines(encoded)
+
+    replace_atomically(filename, write, 'wb')
+    return rows
+
+
+@dataclass
+class FileLoadReport:
+    """Итог загрузки одного файла в load_many"""
+    filename: str
+    loaded: int = 0
+    errors: List[Tuple[int, str, str]] = field(default_factory=list)  # (номер строки, строка, ошибка)
+    failure: Optional[str] = None  # файл не прочитан (целиком или частично)
+
+
+# Задание для процесса-обработчика: (номер файла, имя файла, начало и конец
+# в байтах, номер первой строки куска в файле)
+_ChunkTask = Tuple[int, str, int, int, int]
+
+
+def plan_text_chunks(filename: str, chunk_bytes: int) -> List[Tuple[int, int, int]]:
+    """Разбиение текстового файла на куски по границам строк.
+
+    Возвращает для каждого куска диапазон байтов и номер его первой строки
+    в файле (строки считаются здесь же, поэтому номера не зависят от того,
+    разобраны ли предыдущие куски). Заголовок пропускается по тому же
+    правилу, что и в iter_from_text.
+    """
+    with open(filename, 'rb') as f:
+        head = [f.readline() for _ in range(3)]
+        if head[2]:
+            start, line_no = len(head[0]) + len(head[1]), 3
+        else:
+            start, line_no = 0, 1
+        size = os.fstat(f.fileno()).st_size
+        chunks = []
+        f.seek(start)
+        while start < size:
+            data = f.read(chunk_bytes)
+            tail = f.readline()
+            end = start + len(data) + len(tail)
+            chunks.append((start, end, line_no))
+            line_no += data.count(b"\n") + tail.count(b"\n")
+            start = end
+    return chunks
+
+
+def parse_text_chunk(task: _ChunkTask) -> Tuple[list, list]:
+    """Разбор куска файла в процессе-обработчике.
+
+    Возвращает кортежи полей рецептов и ошибки с номерами строк внутри куска.
+    """
+    _, filename, start, end, _ = task
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    rows, errors = [], []
+    for line_no, line in enumerate(io.TextIOWrapper(io.BytesIO(data), encoding='utf-8'), 1):
+        if not line.strip():
+            continue
+        try:
+            r = SlottedRecipe.from_txt_line(line)
+        except ValueError as e:
+            errors.append((line_no, line.strip(), str(e)))
+        else:
+            rows.append((r.dish_name, r.source, r.prep_time, r.difficulty))
+    return rows, errors
+
+
+def _ordered_results(func: Callable, tasks: List, workers: int) -> Iterator[Tuple[Any, Any, Optional[BaseException]]]:
+    """Результаты func по заданиям строго в порядке заданий.
+
+    В работе одновременно не больше 2 * workers заданий, так что готовые,
+    но ещё не принятые результаты не копятся в памяти.
+    """
+    if workers <= 1:
+        for task in tasks:
+            try:
+                yield task, func(task), None
+            except Exception as e:
+                yield task, None, e
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append((task, pool.submit(func, task)))
+            if len(pending) >= 2 * workers:
+                yield _take_result(pending)
+        while pending:
+            yield _take_result(pending)
+
+
+def _take_result(pending: deque) -> Tuple[Any, Any, Optional[BaseException]]:
+    task, future = pending.popleft()
+    try:
+        return task, future.result(), None
+    except Exception as e:
+        return task, None, e
+
+
+class MappedRecipes:
+    """Рецепты из бинарного файла, открытого через mmap (только чтение).
+
+    Числовые столбцы читаются прямо из отображённой памяти без копирования,
+    строки декодируются при первом обращении к ним. Разбор всех строк файла
+    при открытии не нужен. Строки выдаются объектами recipe_cls.
+    """
+    def __init__(self, filename: str, recipe_cls: type = Recipe):
+        self.recipe_cls = recipe_cls
+        with open(filename, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._open()
+        except Exception:
+            self._mm.close()
+            raise
+
+    def _open(self):
+        if len(self._mm) < _BINARY_HEADER_SIZE:
+            raise ValueError("Файл слишком короткий для бинарного формата рецептов")
+        magic, version, _, rows, strings = _BINARY_HEADER.unpack_from(self._mm)
+        if magic != BINARY_MAGIC:
+            raise ValueError("Файл не является бинарной коллекцией рецептов")
+        if version != BINARY_VERSION:
+            raise ValueError(f"Неподдерживаемая версия формата: {version}")
+        offsets_at, strings_at = _binary_layout(rows, strings)
+        if len(self._mm) < strings_at:
+            raise ValueError("Бинарный файл обрезан")
+
+        self._view = memoryview(self._mm)
+        self._columns = {}
+        for k, field in enumerate(_BINARY_FIELDS):
+            start = _BINARY_HEADER_SIZE + 4 * rows * k
+            self._columns[field] = self._typed(start, 4 * rows, 'i' if field == "prep_time" else 'I')
+        self._offsets = self._typed(offsets_at, 8 * (strings + 1), 'Q')
+        self._strings_at = strings_at
+        self._strings: Dict[int, str] = {}
+
+    def _typed(self, start: int, size: int, typecode: str) -> Sequence[int]:
+        if sys.byteorder == "little":
+            return self._view[start:start + size].cast(typecode)
+        column = array(typecode, self._view[start:start + size])
+        column.byteswap()
+        return column
+
+    def string(self, string_id: int) -> str:
+        value = self._strings.get(string_id)
+        if value is None:
+            start = self._strings_at + self._offsets[string_id]
+            end = self._strings_at + self._offsets[string_id + 1]
+            value = self._strings[string_id] = str(self._view[start:end], 'utf-8')
+        return value
+
+    def column(self, field: str) -> Sequence:
+        """Столбец поля: время — представление памяти файла, строки — ленивая последовательность"""
+        if field == "prep_time":
+            return self._columns[field]
+        return _MappedStringColumn(self, self._columns[field])
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        c, string = self._columns, self.string
+        return self.recipe_cls(string(c["dish_name"][i]), string(c["source"][i]),
+                               c["prep_time"][i], string(c["difficulty"][i]))
+
+    def __iter__(self) -> Iterator[RecipeFormat]:
+        c, string, recipe_cls = self._columns, self.string, self.recipe_cls
+        for dish_id, source_id, prep_time, difficulty_id in zip(
+                c["dish_name"], c["source"], c["prep_time"], c["difficulty"]):
+            yield recipe_cls(string(dish_id), string(source_id), prep_time, string(difficulty_id))
+
+    def __len__(self) -> int:
+        return len(self._columns["prep_time"])
+
+    def close(self):
+        for column in (*self._columns.values(), self._offsets):
+            if isinstance(column, memoryview):
+                column.release()
+        self._view.release()
+        self._mm.close()
+
+    def __enter__(self) -> 'MappedRecipes':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _MappedStringColumn:
+    """Строковый столбец бинарного файла: номера строк → строки по требованию"""
+    def __init__(self, source: MappedRecipes, ids: Sequence[int]):
+        self._source = source
+        self._ids = ids
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._source.string(j) for j in self._ids[i]]
+        return self._source.string(self._ids[i])
+
+    def __iter__(self) -> Iterator[str]:
+        return map(self._source.string, self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+def text_to_binary(txt_filename: str, bin_filename: str,
+                   on_error: Optional[ErrorCallback] = None) -> int:
+    """Преобразование текстового файла коллекции в бинарный"""
+    return write_binary(bin_filename, iter_from_text(txt_filename, on_error, SlottedRecipe))
+
+
+def binary_to_text(bin_filename: str, txt_filename: str) -> int:
+    """Преобразование бинарного файла коллекции в текстовый"""
+    with MappedRecipes(bin_filename) as recipes:
+        return write_text(txt_filename, recipes)
+
+
+RENDER_FORMATS = ("table", "tsv", "ndjson")
+# Заголовок столбца таблицы и его минимальная ширина
+_TABLE_COLUMNS = (("№", 3), ("Блюдо", 30), ("Источник", 25), ("Время (мин)", 12), ("Сложность", 15))
+_TABLE_RULE = 80
+_RECORD_FIELDS = ("dish_name", "source", "prep_time", "difficulty")
+
+
+def _tsv_field(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+def render_recipes(recipes: Iterable[RecipeFormat], out: TextIO, fmt: str = "table",
+                   start_no: int = 1, page_rows: int = 10000) -> int:
+    """Вывод рецептов страницами по page_rows строк — одна запись в out на страницу.
+
+    Ширина столбцов таблицы считается по первой странице, а не по всей
+    коллекции; более длинные значения ниже просто сдвигают строку.
+    """
+    if fmt not in RENDER_FORMATS:
+        raise ValueError(f"Неизвестный формат вывода: {fmt}")
+    pages = batched(recipes, page_rows)
+    count = 0
+    if fmt == "table":
+        first_page = next(pages, [])
+        last_no = start_no + len(first_page) - 1
+        widths = [max(_TABLE_COLUMNS[0][1], len(str(last_no)))]
+        for (_, min_width), field_name in zip(_TABLE_COLUMNS[1:], _RECORD_FIELDS):
+            widths.append(max([min_width] + [len(str(getattr(r, field_name))) for r in first_page]))
+        row_line = "  ".join(f"{{:<{w}}}" for w in widths) + "\n"
+        rule = _TABLE_RULE + sum(widths) - sum(w for _, w in _TABLE_COLUMNS)
+        head = ["\n" + "═" * rule + "\n", row_line.format(*(title for title, _ in _TABLE_COLUMNS)),
+                "─" * rule + "\n"]
+        for page_no, page in enumerate(chain([first_page], pages)):
+            chunk = head if page_no == 0 else []
+            chunk.extend(row_line.format(n, r.dish_name, r.source, r.prep_time, r.difficulty)
+                         for n, r in enumerate(page, start_no + count))
+            count += len(page)
+            out.write("".join(chunk))
+        out.write("═" * rule + "\n")
+    elif fmt == "tsv":
+        out.write("\t".join(_RECORD_FIELDS) + "\n")
+        for page in pages:
+            out.write("".join(f"{_tsv_field(r.dish_name)}\t{_tsv_field(r.source)}\t"
+                              f"{r.prep_time}\t{_tsv_field(r.difficulty)}\n" for r in page))
+            count += len(page)
+    else:
+        dumps = json.JSONEncoder(ensure_ascii=False).encode
+        for page in pages:
+            out.write("".join(dumps({"dish_name": r.dish_name, "source": r.source,
+                                     "prep_time": r.prep_time, "difficulty": r.difficulty}) + "\n"
+                              for r in page))
+            count += len(page)
+    return count
+
+
+class RecipeJournal:
+    """Журнал добавлений к снимку коллекции.
+
+    Снимок — обычный текстовый файл коллекции, журнал (<снимок>.journal) —
+    дописываемые в конец строки рецептов в том же формате. Строки считаются
+    сквозь снимок и журнал (rows — позиция конца журнала). Первая строка
+    журнала хранит позицию, с которой он ведётся, а строка заголовка
+    снимка после сжатия — сколько строк он покрывает: записи, уже вошедшие
+    в снимок (сбой между заменой снимка и сбросом журнала), при
+    воспроизведении пропускаются. У снимка без этой отметки считаются его
+    непустые строки данных, разобранные или нет. Недописанная последняя
+    строка журнала отбрасывается.
+    """
+    HEADER_PREFIX = "#journal base="
+    ROWS_MARK = " #rows="
+
+    def __init__(self, snapshot: str, compact_bytes: int = 16 << 20):
+        self.snapshot = snapshot
+        self.path = snapshot + ".journal"
+        self.compact_bytes = compact_bytes
+        self.rows = 0
+        self._file = None
+
+    def snapshot_rows(self) -> Optional[int]:
+        """Сколько строк покрывает снимок по отметке в заголовке (None — отметки нет)"""
+        if not os.path.exists(self.snapshot):
+            return None
+        with open(self.snapshot, 'r', encoding='utf-8') as f:
+            f.readline()
+            rule = f.readline().rstrip("\n")
+        mark = rule.rfind(self.ROWS_MARK)
+        if mark < 0 or not rule[mark + len(self.ROWS_MARK):].isdigit():
+            return None
+        return int(rule[mark + len(self.ROWS_MARK):])
+
+    def replay(self, snapshot_rows: int, on_error: Optional[ErrorCallback] = None,
+               recipe_cls: type = Recipe) -> Iterator[RecipeFormat]:
+        """Записи журнала, которых ещё нет в снимке из snapshot_rows рецептов"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            header = f.readline().decode('utf-8')
+            if not header.startswith(self.HEADER_PREFIX) or not header.endswith("\n"):
+                raise ValueError(f"Повреждён заголовок журнала {self.path}")
+            row = int(header[len(self.HEADER_PREFIX):])
+            good_end = f.tell()
+            for line_no, raw in enumerate(f, 2):
+                if not raw.endswith(b"\n"):
+                    break  # запись оборвалась при сбое
+                good_end += len(raw)
+                row += 1
+                if row <= snapshot_rows:
+                    continue
+                try:
+                    line = raw.decode('utf-8')
+                    recipe = recipe_cls.from_txt_line(line)
+                except ValueError as e:
+                    if on_error is not None:
+                        on_error(line_no, raw.decode('utf-8', 'replace').strip(), e)
+                    continue
+                yield recipe
+        self.rows = row
+        if good_end < os.path.getsize(self.path):
+            os.truncate(self.path, good_end)
+
+    def start(self, base_rows: int):
+        """Начать новый пустой журнал от снимка из base_rows рецептов"""
+        self.close()
+        replace_atomically(self.path, lambda f: f.write(f"{self.HEADER_PREFIX}{base_rows}\n"))
+        self.rows = base_rows
+
+    def _handle(self):
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        return self._file
+
+    def append(self, recipes: Iterable[RecipeFormat]):
+        """Дописать записи (без fsync — его делает sync)"""
+        f = self._handle()
+        lines = [recipe.to_txt_line() for recipe in recipes]
+        f.writelines(lines)
+        f.flush()
+        self.rows += len(lines)
+
+    def sync(self):
+        f = self._handle()
+        f.flush()
+        os.fsync(f.fileno())
+
+    def size(self) -> int:
+        return os.path.getsize(self.path)
+
+    def compact(self, recipes: Iterable[RecipeFormat]):
+        """Записать полный снимок атомарной заменой и начать журнал заново"""
+        write_text(self.snapshot, recipes, TEXT_HEADER[:-1] + f"{self.ROWS_MARK}{self.rows}\n")
+        self.start(self.rows)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class RecipeIndex:
+    """Вторичные индексы коллекции по номерам строк.
+
+    - время: отсортированные массивы (время, номер) для диапазонных запросов;
+    - сложность и источник: хеш-индексы (значение в нижнем регистре → номера);
+    - название: номера по каждому названию + триграммы → названия для поиска подстроки.
+    """
     def __init__(self):
-        self.recipes: List[Recipe] = []
+        self.clear()
+
+    def clear(self):
+        self.size = 0
+        self.times = array('q')
+        self.time_ids = array('I')
+        self._pending_times: List[Tuple[int, int]] = []
+        self.by_difficulty: Dict[str, array] = {}
+        self.by_source: Dict[str, array] = {}
+        self.by_name: Dict[str, array] = {}
+        self.trigrams: Dict[str, Set[str]] = {}
+
+    def _add_keys(self, row_id: int, recipe: RecipeFormat):
+        for table, value in ((self.by_difficulty, recipe.difficulty),
+                             (self.by_source, recipe.source)):
+            value = value.lower()
+            ids = table.get(value)
+            if ids is None:
+                ids = table[value] = array('I')
+            ids.append(row_id)
+
+        name = recipe.dish_name.lower()
+        ids = self.by_name.get(name)
+        if ids is None:
+            ids = self.by_name[name] = array('I')
+            for trigram in _trigrams(name):
+                self.trigrams.setdefault(trigram, set()).add(name)
+        ids.append(row_id)
+
+    def add(self, recipe: RecipeFormat):
+        """Добавить в индексы рецепт, дописанный в конец коллекции"""
+        row_id = self.size
+        self._add_keys(row_id, recipe)
+        if self._pending_times:
+            self._pending_times.append((recipe.prep_time, row_id))
+        else:
+            pos = bisect_right(self.times, recipe.prep_time)
+            self.times.insert(pos, recipe.prep_time)
+            self.time_ids.insert(pos, row_id)
+        self.size += 1
+
+    def add_many(self, recipes: Iterable[RecipeFormat]):
+        """Добавить пачку рецептов; в индекс времени они вольются при следующем запросе"""
+        for row_id, recipe in enumerate(recipes, self.size):
+            self._add_keys(row_id, recipe)
+            self._pending_times.append((recipe.prep_time, row_id))
+            self.size += 1
+
+    def _merge_pending_times(self):
+        """Слить накопленные пачки с индексом времени за один проход"""
+        if not self._pending_times:
+            return
+        self._pending_times.sort()
+        merged = list(merge(zip(self.times, self.time_ids), self._pending_times))
+        self.times = array('q', [t for t, _ in merged])
+        self.time_ids = array('I', [i for _, i in merged])
+        self._pending_times = []
+
+    def ids_by_time(self, min_time: Optional[int] = None, max_time: Optional[int] = None) -> Sequence[int]:
+        self._merge_pending_times()
+        lo = 0 if min_time is None else bisect_left(self.times, min_time)
+        hi = len(self.times) if max_time is None else bisect_right(self.times, max_time)
+        return self.time_ids[lo:hi] if lo < hi else array('I')
+
+    def names_containing(self, text: str) -> List[str]:
+        """Названия (в нижнем регистре), содержащие подстроку"""
+        text = text.lower()
+        if len(text) < 3:
+            return [name for name in self.by_name if text in name]
+        postings = sorted((self.trigrams.get(t, set()) for t in _trigrams(text)), key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        return [name for name in candidates if text in name]
+
+    def search(self, recipes: Sequence[RecipeFormat], name: Optional[str] = None,
+               source: Optional[str] = None, difficulty: Optional[str] = None,
+               min_time: Optional[int] = None, max_time: Optional[int] = None) -> List[int]:
+        """Номера строк, подходящих под все фильтры, по возрастанию.
+
+        Из фильтров берётся самый узкий список кандидатов по индексу, остальные
+        условия проверяются только на нём — полного прохода по коллекции нет.
+        """
+        candidates = []
+        checks = []
+        if min_time is not None or max_time is not None:
+            candidates.append(self.ids_by_time(min_time, max_time))
+            lo = float('-inf') if min_time is None else min_time
+            hi = float('inf') if max_time is None else max_time
+            checks.append(lambda r: lo <= r.prep_time <= hi)
+        if difficulty is not None:
+            difficulty = difficulty.lower()
+            candidates.append(self.by_difficulty.get(difficulty, ()))
+            checks.append(lambda r: r.difficulty.lower() == difficulty)
+        if source is not None:
+            source = source.lower()
+            candidates.append(self.by_source.get(source, ()))
+            checks.append(lambda r: r.source.lower() == source)
+        if name is not None:
+            text = name.lower()
+            names = self.names_containing(text)
+            candidates.append(list(chain.from_iterable(self.by_name[n] for n in names)))
+            checks.append(lambda r: text in r.dish_name.lower())
+
+        if not candidates:
+            return list(range(self.size))
+        narrowest = min(range(len(candidates)), key=lambda k: len(candidates[k]))
+        others = checks[:narrowest] + checks[narrowest + 1:]
+        return [i for i in sorted(candidates[narrowest])
+                if all(check(recipes[i]) for check in others)]
+
+
+class RecipeCollection:
+    """Управление личной коллекцией рецептов
+
+    storage выбирает способ хранения: "list" — список Recipe, "slots" — список
+    SlottedRecipe без __dict__, "columnar" — колоночное ColumnarRecipeList.
+    """
+    STORAGES = ("list", "slots", "columnar")
+
+    def __init__(self, storage: str = "list"):
+        if storage not in self.STORAGES:
+            raise ValueError(f"Неизвестный способ хранения: {storage}")
+        self.storage = storage
+        self.recipe_cls = Recipe if storage == "list" else SlottedRecipe
+        self.recipes = ColumnarRecipeList() if storage == "columnar" else []
+        self.index = RecipeIndex()
+        # Записи хранятся в порядке добавления, сортировка задаёт только порядок вывода
+        self.sort_cache = SortOrderCache()
+        self.sort_criteria: Tuple[str, ...] = ()
+        self.journal: Optional[RecipeJournal] = None
+
+    def ordered(self, offset: int = 0, limit: Optional[int] = None) -> Iterator[RecipeFormat]:
+        """Рецепты в текущем порядке сортировки (со смещением и ограничением)"""
+        recipes = self.recipes
+        stop = len(recipes) if limit is None else min(len(recipes), offset + limit)
+        if not self.sort_criteria:
+            if offset == 0 and stop == len(recipes):
+                return iter(recipes)
+            return map(recipes.__getitem__, range(offset, stop))
+        order = self.sort_cache.order(recipes, self.sort_criteria)
+        return map(recipes.__getitem__, order[offset:stop])
+
+    def _sync_index(self):
+        """Довести индексы до текущего состояния коллекции"""
+        if self.index.size > len(self.recipes):
+            self.index.clear()
+        if self.index.size < len(self.recipes):
+            self.index.add_many(self.recipes[self.index.size:])
+
+    def _extend(self, batch: List[RecipeFormat]):
+        """Дописать пачку рецептов в хранилище, индексы и журнал"""
+        self.recipes.extend(batch)
+        self.index.add_many(batch)
+        if self.journal is not None:
+            self.journal.append(batch)
 
     def add_recipe(self, dish_name: str, source: str, prep_time: int, difficulty: str = "Средний"):
-        recipe = Recipe(dish_name.strip(), source.strip(), prep_time, difficulty.strip())
+        recipe = self.recipe_cls(dish_name.strip(), source.strip(), prep_time, difficulty.strip())
+        self._sync_index()
         self.recipes.append(recipe)
+        self.index.add(recipe)
+        if self.journal is not None:
+            self.journal.append([recipe])
+        if self.sort_criteria:
+            self.sort_cache.order(self.recipes, self.sort_criteria)
         print(f"Рецепт добавлен: {recipe}")
 
     def add_recipe_from_input(self):
@@ -78,77 +1018,257 @@ class RecipeCollection:
         self.add_recipe(dish_name, source, prep_time, difficulty)
         print("Рецепт сохранён!\n")
 
-    def sort_recipes(self, by: str):
-        if by == "dish":
-            self.recipes.sort(key=lambda r: r.dish_name.lower())
-            print("Отсортировано по названию блюда")
-        elif by == "source":
-            self.recipes.sort(key=lambda r: r.source.lower())
-            print("Отсортировано по источнику")
-        elif by == "time":
-            self.recipes.sort(key=lambda r: r.prep_time)
-            print("Отсортировано по времени приготовления")
-        elif by == "difficulty":
-            diff_order = {"лёгкий": 0, "средний": 1, "сложный": 2}
-            self.recipes.sort(key=lambda r: diff_order.get(r.difficulty.lower(), 1))
-            print("Отсортировано по сложности")
-        else:
+    def sort_recipes(self, by: Union[str, Sequence[str]]):
+        """Сортировка по критерию или по нескольким ("dish", "source", "time", "difficulty")"""
+        criteria = (by,) if isinstance(by, str) else tuple(by)
+        if not criteria or any(c not in SORT_CRITERIA for c in criteria):
             print("Неизвестный критерий сортировки")
+            return
+        self.sort_cache.order(self.recipes, criteria)
+        self.sort_criteria = criteria
+        print("Отсортировано по " + ", затем по ".join(SORT_CRITERIA[c][2] for c in criteria))
 
-    def print_recipes(self):
-        if not self.recipes:
-            print("\nКоллекция рецептов пуста.")
+    def sort_recipes_from_input(self):
+        names = input("Критерии через запятую (dish, source, time, difficulty): ")
+        self.sort_recipes([c.strip() for c in names.split(",") if c.strip()])
+
+    def print_recipes(self, offset: int = 0, limit: Optional[int] = None, fmt: str = "table",
+                      out: Optional[TextIO] = None):
+        """Вывод коллекции: таблица, TSV или NDJSON, со смещением и ограничением"""
+        out = out or sys.stdout
+        if fmt not in RENDER_FORMATS:
+            print(f"Неизвестный формат вывода: {fmt}")
+            return
+        if not self.recipes and fmt == "table":
+            out.write("\nКоллекция рецептов пуста.\n")
             return
 
-        print("\n" + "═" * 80)
-        print(f"{'№':<3}  {'Блюдо':<30}  {'Источник':<25}  {'Время (мин)':<12}  {'Сложность':<15}")
-        print("─" * 80)
-        for i, r in enumerate(self.recipes, 1):
-            print(f"{i:<3}  {r.dish_name:<30}  {r.source:<25}  {r.prep_time:<12}  {r.difficulty:<15}")
-        print("═" * 80)
+        shown = render_recipes(self.ordered(offset, limit), out, fmt, offset + 1)
+        if fmt == "table" and (offset or limit is not None):
+            out.write(f"Показаны записи {offset + 1}–{offset + shown} из {len(self.recipes)}\n")
+
+    def find(self, name: Optional[str] = None, source: Optional[str] = None,
+             difficulty: Optional[str] = None, min_time: Optional[int] = None,
+             max_time: Optional[int] = None) -> List[int]:
+        """Номера рецептов по фильтрам (все условия через «и», время — включительно)"""
+        self._sync_index()
+        return self.index.search(self.recipes, name, source, difficulty, min_time, max_time)
+
+    def query(self, name: Optional[str] = None, source: Optional[str] = None,
+              difficulty: Optional[str] = None, min_time: Optional[int] = None,
+              max_time: Optional[int] = None) -> List[RecipeFormat]:
+        """Рецепты по фильтрам: подстрока названия, источник, сложность, диапазон времени"""
+        return [self.recipes[i] for i in self.find(name, source, difficulty, min_time, max_time)]
+
+    def query_from_input(self):
+        print("\nПоиск рецептов (Enter — пропустить условие)")
+        print("-" * 40)
+        name = input("Название содержит: ").strip() or None
+        source = input("Источник: ").strip() or None
+        difficulty = input("Сложность (лёгкий/средний/сложный): ").strip() or None
+        try:
+            min_time = int(input("Время от (мин): ").strip() or 0) or None
+            max_time = int(input("Время до (мин): ").strip() or 0) or None
+        except ValueError:
+            print("Время — это число минут")
+            return
+
+        found = self.query(name, source, difficulty, min_time, max_time)
+        if not found:
+            print("Ничего не найдено")
+            return
+        print(f"Найдено рецептов: {len(found)}")
+        for recipe in found:
+            print(f"  {recipe}")
 
     def save_to_text(self, filename: str):
         """Выгрузка коллекции в текстовый файл"""
         if not filename.endswith('.txt'):
             filename += '.txt'
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write("БЛЮДО|ИСТОЧНИК|ВРЕМЯ|СЛОЖНОСТЬ\n")
-                f.write("-" * 70 + "\n")
-                for recipe in self.recipes:
-                    f.write(recipe.to_txt_line())
+            write_text(filename, self.ordered())
             print(f"Коллекция рецептов сохранена в файл: {filename}")
         except Exception as e:
             print(f"Ошибка записи: {e}")
 
-    def load_from_text(self, filename: str):
-        """Загрузка коллекции из текстового файла"""
+    def load_from_text(self, filename: str, on_error: Optional[ErrorCallback] = None,
+                       batch_size: int = 10000):
+        """Загрузка коллекции из текстового файла (потоково, пачками)"""
         if not filename.endswith('.txt'):
             filename += '.txt'
+        # Без своего обработчика — только счётчик и первая ошибка: память не
+        # растёт с числом некорректных строк
+        skipped = 0
+        first_error: Optional[Tuple[int, str, ValueError]] = None
+        if on_error is None:
+            def on_error(line_no: int, line: str, error: ValueError):
+                nonlocal skipped, first_error
+                skipped += 1
+                if first_error is None:
+                    first_error = (line_no, line, error)
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            if not lines:
+            if os.path.getsize(filename) == 0:
                 print("Файл пустой")
                 return
 
-            data_lines = lines[2:] if len(lines) > 2 else lines
-            loaded = []
-            for line in data_lines:
-                if not line.strip():
-                    continue
-                try:
-                    recipe = Recipe.from_txt_line(line)
-                    loaded.append(recipe)
-                except ValueError as e:
-                    print(f"Пропущена строка: {line.strip()} → {e}")
-            self.recipes.extend(loaded)
-            print(f"Загружено {len(loaded)} рецептов. Всего теперь: {len(self.recipes)}")
+            loaded = 0
+            self._sync_index()
+            for batch in iter_batches_from_text(filename, batch_size, on_error, self.recipe_cls):
+                self._extend(batch)
+                loaded += len(batch)
+            if skipped:
+                line_no, line, error = first_error
+                print(f"Пропущено строк: {skipped} (первая — №{line_no}: {line} → {error})")
+            print(f"Загружено {loaded} рецептов. Всего теперь: {len(self.recipes)}")
+        except FileNotFoundError:
+            print(f"Файл {filename} не найден")
+        except Exception as e:
+            print(f"Ошибка чтения: {e}")
+
+    def save_to_binary(self, filename: str):
+        """Выгрузка коллекции в бинарный файл"""
+        if not filename.endswith('.bin'):
+            filename += '.bin'
+        try:
+            write_binary(filename, self.ordered())
+            print(f"Коллекция рецептов сохранена в бинарный файл: {filename}")
+        except Exception as e:
+            print(f"Ошибка записи: {e}")
+
+    def load_from_binary(self, filename: str, batch_size: int = 10000):
+        """Загрузка коллекции из бинарного файла"""
+        if not filename.endswith('.bin'):
+            filename += '.bin'
+        try:
+            with MappedRecipes(filename, self.recipe_cls) as mapped:
+                self._sync_index()
+                for batch in batched(mapped, batch_size):
+                    self._extend(batch)
+                print(f"Загружено {len(mapped)} рецептов. Всего теперь: {len(self.recipes)}")
         except FileNotFoundError:
             print(f"Файл {filename} не найден")
         except Exception as e:
             print(f"Ошибка чтения: {e}")
 
+    def load_many(self, paths: Sequence[str], workers: Optional[int] = None,
+                  chunk_bytes: int = 4 << 20) -> List[FileLoadReport]:
+        """Параллельная загрузка нескольких текстовых файлов.
+
+        Файлы режутся на куски по границам строк и разбираются пулом процессов;
+        результаты принимаются в порядке файлов и кусков, поэтому итоговый
+        порядок рецептов такой же, как при последовательных load_from_text.
+        """
+        workers = workers or os.cpu_count() or 1
+        reports = [FileLoadReport(path) for path in paths]
+        tasks: List[_ChunkTask] = []
+        for file_no, path in enumerate(paths):
+            try:
+                chunks = plan_text_chunks(path, chunk_bytes)
+            except OSError as e:
+                reports[file_no].failure = str(e)
+                chunks = []
+            tasks.extend((file_no, path, start, end, line_no) for start, end, line_no in chunks)
+
+        self._sync_index()
+        recipe_cls = self.recipe_cls
+        results = _ordered_results(parse_text_chunk, tasks, workers)
+        for (file_no, _, start, _, first_line_no), result, error in results:
+            report = reports[file_no]
+            if error is not None:
+                report.failure = report.failure or f"байты с {start}: {error}"
+                continue
+            rows, errors = result
+            batch = [recipe_cls(*row) for row in rows]
+            self._extend(batch)
+            report.loaded += len(batch)
+            base = first_line_no - 1
+            report.errors.extend((base + n, line, err) for n, line, err in errors)
+
+        total = sum(r.loaded for r in reports)
+        print(f"Загружено {total} рецептов из {len(reports)} файлов. Всего теперь: {len(self.recipes)}")
+        for report in reports:
+            if report.failure:
+                print(f"  {report.filename}: ошибка чтения — {report.failure}")
+            if report.errors:
+                line_no, line, error = report.errors[0]
+                print(f"  {report.filename}: пропущено строк {len(report.errors)} "
+                      f"(первая — №{line_no}: {line} → {error})")
+        return reports
+
+    def open_journal(self, filename: str, compact_bytes: int = 16 << 20,
+                     on_error: Optional[ErrorCallback] = None, batch_size: int = 10000):
+        """Режим журнала: загрузить снимок и журнал, дальше добавления дописываются в журнал"""
+        if not filename.endswith('.txt'):
+            filename += '.txt'
+        if self.journal is not None:
+            self.close_journal()
+        journal = RecipeJournal(filename, compact_bytes)
+        existing = len(self.recipes)
+        # Снимок и журнал читаются во временный список: при ошибке коллекция не меняется
+        loaded: List[RecipeFormat] = []
+        malformed = 0
+
+        def count_error(line_no: int, line: str, error: ValueError):
+            nonlocal malformed
+            malformed += 1
+            if on_error is not None:
+                on_error(line_no, line, error)
+
+        try:
+            snapshot_rows = 0
+            if os.path.exists(filename):
+                for batch in iter_batches_from_text(filename, batch_size, count_error, self.recipe_cls):
+                    loaded.extend(batch)
+                snapshot_rows = len(loaded)
+            base = journal.snapshot_rows()
+            if base is None:
+                base = snapshot_rows + malformed
+            for batch in batched(journal.replay(base, on_error, self.recipe_cls), batch_size):
+                loaded.extend(batch)
+            replayed = len(loaded) - snapshot_rows
+            if not os.path.exists(journal.path):
+                journal.start(base)
+            # Рецепты, добавленные до открытия журнала, тоже должны пережить перезапуск
+            journal.append(self.recipes[:existing])
+            journal.sync()
+            self._sync_index()
+            self._extend(loaded)
+            self.journal = journal
+            print(f"Журнал открыт: {filename}. Из снимка: {snapshot_rows}, из журнала: {replayed}. "
+                  f"Всего теперь: {len(self.recipes)}")
+        except Exception as e:
+            journal.close()
+            print(f"Ошибка открытия журнала: {e}")
+
+    def save(self):
+        """Сохранение в режиме журнала: fsync журнала, сжатие при превышении порога"""
+        if self.journal is None:
+            print("Журнал не открыт")
+            return
+        try:
+            self.journal.sync()
+            if self.journal.size() > self.journal.compact_bytes:
+                self.compact()
+        except Exception as e:
+            print(f"Ошибка записи: {e}")
+
+    def compact(self):
+        """Перенос журнала в снимок (атомарная замена файла)"""
+        if self.journal is None:
+            print("Журнал не открыт")
+            return
+        try:
+            self.journal.compact(self.ordered())
+            print(f"Журнал сжат, снимок обновлён: {self.journal.snapshot}")
+        except Exception as e:
+            print(f"Ошибка записи: {e}")
+
+    def close_journal(self):
+        if self.journal is not None:
+            self.journal.sync()
+            self.journal.close()
+            self.journal = None
+
 
 def main_loop():
     collection = RecipeCollection()
@@ -166,6 +1286,12 @@ def main_loop():
         print(" 7 — Сохранить в текстовый файл")
         print(" 8 — Загрузить из текстового файла")
         print(" 9 — Выход")
+        print("10 — Найти рецепты")
+        print("11 — Сортировать по нескольким полям")
+        print("12 — Сохранить в бинарный файл")
+        print("13 — Загрузить из бинарного файла")
+        print("14 — Вести журнал в файле (автосохранение)")
+        print("15 — Сжать журнал в снимок")
         print("─" * 50)
 
         choice = input("Выбор: ").strip()
@@ -174,6 +1300,8 @@ def main_loop():
             collection.print_recipes()
         elif choice == '2':
             collection.add_recipe_from_input()
+            if collection.journal is not None:
+                collection.save()
         elif choice == '3':
             collection.sort_recipes("dish")
             collection.print_recipes()
@@ -193,7 +1321,25 @@ def main_loop():
             fname = input("Имя файла (без .txt): ").strip() or "my_recipes"
             collection.load_from_text(fname)
             collection.print_recipes()
+        elif choice == '10':
+            collection.query_from_input()
+        elif choice == '11':
+            collection.sort_recipes_from_input()
+            collection.print_recipes()
+        elif choice == '12':
+            fname = input("Имя файла (без .bin): ").strip() or "my_recipes"
+            collection.save_to_binary(fname)
+        elif choice == '13':
+            fname = input("Имя файла (без .bin): ").strip() or "my_recipes"
+            collection.load_from_binary(fname)
+            collection.print_recipes()
+        elif choice == '14':
+            fname = input("Имя файла (без .txt): ").strip() or "my_recipes"
+            collection.open_journal(fname)
+        elif choice == '15':
+            collection.compact()
         elif choice == '9':
+            collection.close_journal()
             print("\nПриятного аппетита!")
             break
         else:
@@ -202,5 +1348,30 @@ def main_loop():
         input("\nEnter → продолжить...")
 
 
+def main():
+    parser = argparse.ArgumentParser(description="Кулинарная книга. Без аргументов — интерактивное меню.")
+    parser.add_argument("files", nargs="*", help="текстовые файлы коллекции для вывода")
+    parser.add_argument("--format", choices=RENDER_FORMATS, default="table")
+    parser.add_argument("--sort", help="критерии через запятую: dish, source, time, difficulty")
+    parser.add_argument("--offset", type=int, default=0)
+    parser.add_argument("--limit", type=int)
+    args = parser.parse_args()
+
+    if not args.files:
+        main_loop()
+        return
+
+    collection = RecipeCollection("columnar")
+    # Служебные сообщения — в stderr, чтобы не портить вывод для других программ
+    with contextlib.redirect_stdout(sys.stderr):
+        if len(args.files) > 1:
+            collection.load_many(args.files)
+        else:
+            collection.load_from_text(args.files[0])
+        if args.sort:
+            collection.sort_recipes([c.strip() for c in args.sort.split(",")])
+    collection.print_recipes(args.offset, args.limit, args.format)
+
+
 if __name__ == "__main__":
-    main_loop()
+    main()
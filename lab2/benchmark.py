@@ -0,0 +1,70 @@
+"""Замеры производительности калькулятора роста инвестиций
+
+Запуск:
+    python benchmark.py monte-carlo [--paths 1000000] [--workers 1 2 4]   # код выхода 1, если дольше цели
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from lab2 import CATEGORIES, HORIZON_YEARS, GrowthModel
+
+# Цель: миллион путей на 15 лет — за секунды; для других --paths пропорционально
+TARGET_SECONDS_PER_MILLION = 5.0
+
+
+def bench_monte_carlo(paths: int, workers_list, reinvest_type: str) -> bool:
+    """Возвращает, уложилось ли моделирование в цель по времени"""
+    model = GrowthModel()
+    years = max(HORIZON_YEARS.values())
+    periods = model.reinvest_freq[reinvest_type] * years
+    draws = paths * years
+    target = TARGET_SECONDS_PER_MILLION * paths / 1_000_000
+    print(f"{paths:,} путей × {periods:,} периодов ({draws:,} годовых шоков), "
+          f"реинвестирование: {reinvest_type}")
+    print(f"{'Процессов':>9}  {'Время, с':>9}  {'Шоков/с':>14}  {'Отклонение':>10}")
+    print("─" * 50)
+    start = time.perf_counter()
+    exact = model.percentiles(reinvest_type=reinvest_type)
+    closed_form = time.perf_counter() - start
+    slowest = 0.0
+    for workers in workers_list:
+        start = time.perf_counter()
+        result = model.simulate(paths, reinvest_type=reinvest_type, seed=1, workers=workers)
+        elapsed = time.perf_counter() - start
+        slowest = max(slowest, elapsed)
+        # Наибольшее относительное отличие перцентилей от замкнутой формы
+        deviation = float(np.abs(result.factors / exact.factors - 1).max())
+        print(f"{workers:>9}  {elapsed:>9.2f}  {draws / elapsed:>14,.0f}  {deviation:>9.2%}")
+    print(f"Замкнутая форма (percentiles): {closed_form * 1000:.2f} мс")
+
+    print(f"\nИтоговая стоимость 100 000 ₽ ({CATEGORIES[0]}), перцентили "
+          + ", ".join(f"P{p:g}" for p in result.percentiles))
+    for horizon, row in zip(model.horizons, result.final_values(100000)):
+        print(f"{horizon:<8} " + "  ".join(f"{v:>12,.0f}" for v in row))
+
+    ok = slowest <= target
+    print(f"\nЦель {target:g} с: {'выполнена' if ok else 'НЕ ВЫПОЛНЕНА'} (самый медленный прогон {slowest:.2f} с)")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки калькулятора роста инвестиций")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    monte_carlo = commands.add_parser("monte-carlo", help="скорость моделирования Монте-Карло (шоков в секунду)")
+    monte_carlo.add_argument("--paths", type=int, default=1_000_000)
+    monte_carlo.add_argument("--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}))
+    monte_carlo.add_argument("--reinvest", default="Ежедневно")
+
+    args = parser.parse_args()
+    if args.command == "monte-carlo":
+        if not bench_monte_carlo(args.paths, args.workers, args.reinvest):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,623 @@
+import argparse
+import csv
+import json
+import queue
+import sys
+import time
 import tkinter as tk
 from tkinter import ttk
-from math import pow
+from bisect import bisect_right
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from math import nextafter, inf, nan, pow
+from statistics import NormalDist
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # пакетный расчёт недоступен, GUI работает и без numpy
+    np = None
+
+
+# Среднегодовая ожидаемая доходность акций (в %)
+EXPECTED_RETURNS = {
+    "1 год": {"до 300 тыс.": 9.5, "300–800 тыс.": 10.0, "800 тыс.–2 млн": 10.5, "свыше 2 млн": 11.0},
+    "3 года": {"до 300 тыс.": 10.0, "300–800 тыс.": 10.8, "800 тыс.–2 млн": 11.3, "свыше 2 млн": 11.8},
+    "5 лет": {"до 300 тыс.": 10.5, "300–800 тыс.": 11.2, "800 тыс.–2 млн": 11.8, "свыше 2 млн": 12.5},
+    "7 лет": {"до 300 тыс.": 11.0, "300–800 тыс.": 11.7, "800 тыс.–2 млн": 12.3, "свыше 2 млн": 13.0},
+    "10 лет": {"до 300 тыс.": 11.5, "300–800 тыс.": 12.2, "800 тыс.–2 млн": 12.8, "свыше 2 млн": 13.5},
+    "15+ лет": {"до 300 тыс.": 12.0, "300–800 тыс.": 12.7, "800 тыс.–2 млн": 13.3, "свыше 2 млн": 14.0}
+}
+
+# Частота реинвестирования дивидендов (примерно соответствует периодам)
+REINVEST_FREQ = {
+    "Без реинвестирования": 1,
+    "Ежегодно": 1,
+    "Ежеквартально": 4,
+    "Ежемесячно": 12,
+    "Ежедневно": 365
+}
+
+# Длительность горизонта в годах
+HORIZON_YEARS = {"1 год": 1, "3 года": 3, "5 лет": 5, "7 лет": 7, "10 лет": 10, "15+ лет": 15}
+
+NO_REINVEST = "Без реинвестирования"
+MIN_INVESTMENT = 30000
+
+# Категории суммы и их верхние границы: до 300 тыс. — строго меньше,
+# остальные — включительно, поэтому границы 800 тыс. и 2 млн сдвинуты
+# на наименьший шаг вверх и поиск идёт справа.
+CATEGORIES = ("до 300 тыс.", "300–800 тыс.", "800 тыс.–2 млн", "свыше 2 млн")
+CATEGORY_BOUNDS = (300000.0, nextafter(800000.0, inf), nextafter(2000000.0, inf))
+
+
+def category_index(initial: float) -> int:
+    """Номер категории суммы (индекс в CATEGORIES)"""
+    return bisect_right(CATEGORY_BOUNDS, initial)
+
+
+def parse_amount(text: str) -> float:
+    """Число из поля ввода: пробелы игнорируются, запятая — десятичный разделитель"""
+    return float(text.replace(" ", "").replace(",", "."))
+
+
+@dataclass
+class Projection:
+    """Результат расчёта одного портфеля"""
+    category: str
+    rate: float            # ожидаемая доходность, % годовых
+    periods_per_year: int
+    final: float
+    profit: float
+    effective: float       # эффективная доходность, % годовых
+
+
+@dataclass
+class ProjectionBatch:
+    """Результаты пакетного расчёта: по элементу массива на портфель"""
+    category: "np.ndarray"   # индексы в CATEGORIES
+    rate: "np.ndarray"
+    final: "np.ndarray"
+    profit: "np.ndarray"
+    effective: "np.ndarray"
+    valid: "np.ndarray"      # False — сумма ниже минимальной, значения NaN
+
+
+@dataclass
+class SimulationResult:
+    """Перцентили итоговой стоимости: по моделированию Монте-Карло или в замкнутой форме"""
+    reinvest_type: str
+    volatility: float
+    paths: int               # 0 — перцентили посчитаны по формуле, без розыгрыша путей
+    percentiles: Tuple[float, ...]
+    factors: "np.ndarray"    # [горизонт, категория, перцентиль] — во сколько раз вырастет сумма
+
+    def final_values(self, initial: float) -> "np.ndarray":
+        """Перцентили итоговой стоимости для суммы initial: [горизонт, перцентиль]"""
+        return initial * self.factors[:, category_index(initial), :]
+
+
+# Гистограмма нормированной суммы шоков: число интервалов и полуширина в σ
+SIM_BINS = 8192
+SIM_SPAN = 8.0
+# Сколько шоков разыгрывается за раз: ограничивает память процесса
+SIM_BLOCK_DRAWS = 1 << 22
+
+
+def _simulate_chunk(task) -> "np.ndarray":
+    """Гистограммы по горизонтам для одной пачки путей (выполняется в процессе пула).
+
+    Шоки периодов внутри года независимы и нормальны, поэтому их сумма,
+    делённая на √(число периодов), — ровно N(0, 1): вместо m шоков в год
+    каждый путь разыгрывает один годовой шок с тем же распределением.
+    Накопленная сумма годовых шоков, делённая на √(лет), попадает в
+    гистограмму горизонта. Пути идут блоками по SIM_BLOCK_DRAWS шоков.
+    """
+    seed, paths, years = task
+    rng = np.random.default_rng(seed)
+    hist = np.zeros((len(years), SIM_BINS), dtype=np.int64)
+    last = max(years)
+    rows = max(1, min(paths, SIM_BLOCK_DRAWS // last))
+    for start in range(0, paths, rows):
+        totals = rng.standard_normal((min(rows, paths - start), last)).cumsum(axis=1)
+        for h, year in enumerate(years):
+            z = totals[:, year - 1] / np.sqrt(year)
+            pos = (z + SIM_SPAN) * (SIM_BINS / (2 * SIM_SPAN))
+            hist[h] += np.bincount(np.clip(pos.astype(np.int64), 0, SIM_BINS - 1),
+                                   minlength=SIM_BINS)
+    return hist
+
+
+def _hist_quantiles(hist: "np.ndarray", qs: "np.ndarray") -> "np.ndarray":
+    """Квантили по гистограмме с линейной интерполяцией внутри интервала"""
+    width = 2 * SIM_SPAN / SIM_BINS
+    cdf = np.cumsum(hist) / hist.sum()
+    idx = np.minimum(np.searchsorted(cdf, qs), SIM_BINS - 1)
+    below = np.where(idx > 0, cdf[idx - 1], 0.0)
+    inside = np.where(hist[idx] > 0, (qs - below) / np.maximum(cdf[idx] - below, 1e-300), 0.5)
+    return -SIM_SPAN + (idx + inside) * width
+
+
+def require_numpy():
+    if np is None:
+        raise ImportError("Для пакетного расчёта нужен пакет numpy")
+
+
+class GrowthTable:
+    """Предрасчитанные множители роста и эффективные доходности по всем ячейкам таблиц.
+
+    Для каждой пары (горизонт, тип реинвестирования) хранится по категории
+    кортеж (ставка %, множитель роста, эффективная доходность %). Для режима
+    без реинвестирования множитель зависит от дивидендной доходности и
+    считается по линейной формуле при расчёте.
+    """
+    def __init__(self, expected_returns: Dict[str, Dict[str, float]], reinvest_freq: Dict[str, int]):
+        self.horizons = list(expected_returns)
+        self.reinvest_types = list(reinvest_freq)
+        self.cells: Dict[Tuple[str, str], Tuple[Tuple[float, float, float], ...]] = {}
+        for horizon in self.horizons:
+            years = HORIZON_YEARS[horizon]
+            for reinvest_type in self.reinvest_types:
+                m = reinvest_freq[reinvest_type]
+                row = []
+                for category in CATEGORIES:
+                    r = expected_returns[horizon][category]
+                    if reinvest_type == NO_REINVEST:
+                        row.append((r, nan, nan))
+                    else:
+                        growth = pow(1 + (r / 100) / m, m * years)
+                        row.append((r, growth, (growth - 1) * 100 / years))
+                self.cells[horizon, reinvest_type] = tuple(row)
+        self._arrays = None
+
+    def arrays(self) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """Те же значения массивами [горизонт, категория, тип] для векторного расчёта"""
+        if self._arrays is None:
+            require_numpy()
+            cells = np.array([[self.cells[h, t] for t in self.reinvest_types] for h in self.horizons])
+            cells = cells.transpose(0, 2, 1, 3)  # [горизонт, категория, тип, значение]
+            self._arrays = cells[..., 0], cells[..., 1], cells[..., 2]
+        return self._arrays
+
+
+class GrowthModel:
+    """Модель роста портфеля без привязки к GUI.
+
+    Множители роста считаются один раз на все ячейки таблиц (GrowthTable);
+    при замене таблиц доходностей или частот кэш сбрасывается.
+    """
+    def __init__(self, expected_returns: Dict[str, Dict[str, float]] = EXPECTED_RETURNS,
+                 reinvest_freq: Dict[str, int] = REINVEST_FREQ):
+        self.set_tables(expected_returns, reinvest_freq)
+
+    def set_tables(self, expected_returns: Dict[str, Dict[str, float]], reinvest_freq: Dict[str, int]):
+        self._expected_returns = expected_returns
+        self._reinvest_freq = reinvest_freq
+        self._table: Optional[GrowthTable] = None
+
+    def load_tables(self, filename: str):
+        """Загрузка таблиц из JSON: {"expected_returns": {...}, "reinvest_freq": {...}}"""
+        with open(filename, encoding="utf-8") as f:
+            data = json.load(f)
+        self.set_tables(data.get("expected_returns", self._expected_returns),
+                        data.get("reinvest_freq", self._reinvest_freq))
+
+    @property
+    def expected_returns(self) -> Dict[str, Dict[str, float]]:
+        return self._expected_returns
+
+    @expected_returns.setter
+    def expected_returns(self, value: Dict[str, Dict[str, float]]):
+        self.set_tables(value, self._reinvest_freq)
+
+    @property
+    def reinvest_freq(self) -> Dict[str, int]:
+        return self._reinvest_freq
+
+    @reinvest_freq.setter
+    def reinvest_freq(self, value: Dict[str, int]):
+        self.set_tables(self._expected_returns, value)
+
+    @property
+    def table(self) -> GrowthTable:
+        if self._table is None:
+            self._table = GrowthTable(self._expected_returns, self._reinvest_freq)
+        return self._table
+
+    @property
+    def horizons(self) -> list:
+        return self.table.horizons
+
+    @property
+    def reinvest_types(self) -> list:
+        return self.table.reinvest_types
+
+    def project_one(self, initial: float, horizon: str, reinvest_type: str, div_yield: float) -> Projection:
+        """Расчёт одного портфеля (без numpy): поиск в таблице и одно умножение"""
+        if initial < MIN_INVESTMENT:
+            raise ValueError("Минимальная сумма инвестиций — 30 000 ₽")
+
+        category_no = category_index(initial)
+        r, growth, effective = self.table.cells[horizon, reinvest_type][category_no]
+        m = self._reinvest_freq[reinvest_type]
+
+        if reinvest_type == NO_REINVEST:
+            # Только рост цены без реинвестирования дивидендов
+            final = initial * (1 + (r / 100 - div_yield / 100) * HORIZON_YEARS[horizon])
+            effective = (r - div_yield)
+        else:
+            # Полная капитализация (рост + реинвестированные дивиденды)
+            final = initial * growth
+        return Projection(CATEGORIES[category_no], r, m, final, final - initial, effective)
+
+    def schedule(self, initial: float, horizon: str, reinvest_type: str, div_yield: float,
+                 yearly: bool = False) -> Iterator[Tuple[int, float]]:
+        """График стоимости портфеля: пары (номер периода, стоимость), начиная с (0, initial).
+
+        Внутри года стоимость накапливается бегущим произведением (без реинвестирования —
+        бегущей суммой), а в конце каждого года пересчитывается по точной формуле,
+        чтобы не копилась ошибка округления; последняя строка совпадает с project_one.
+        yearly=True — только годовые отметки, номер периода тогда — номер года.
+        """
+        if initial < MIN_INVESTMENT:
+            raise ValueError("Минимальная сумма инвестиций — 30 000 ₽")
+
+        r = self.table.cells[horizon, reinvest_type][category_index(initial)][0]
+        m = self._reinvest_freq[reinvest_type]
+        years = HORIZON_YEARS[horizon]
+
+        if reinvest_type == NO_REINVEST:
+            rate = r / 100 - div_yield / 100
+            increment = initial * rate / m
+
+            def next_balance(balance):
+                return balance + increment
+
+            def year_end(year):
+                return initial * (1 + rate * year)
+        else:
+            step = 1 + (r / 100) / m
+
+            def next_balance(balance):
+                return balance * step
+
+            def year_end(year):
+                return initial * pow(step, m * year)
+
+        balance = initial
+        yield 0, balance
+        for year in range(1, years + 1):
+            if not yearly:
+                period = (year - 1) * m
+                for k in range(1, m):
+                    balance = next_balance(balance)
+                    yield period + k, balance
+            balance = year_end(year)
+            yield (year if yearly else year * m), balance
+
+    def schedule_batch(self, initial, horizon, reinvest, div_yield, yearly: bool = False) -> "np.ndarray":
+        """График стоимости для массива портфелей: матрица [портфель, период].
+
+        Аргументы — как у project. Столбец 0 — начальная сумма, далее по столбцу
+        на период реинвестирования портфеля (yearly=True — на год). У портфелей
+        с разными горизонтами и частотами разное число периодов: хвост строки
+        после горизонта и строки с суммой ниже минимальной заполнены NaN.
+        Стоимость накапливается cumprod по строкам; последний период каждой
+        строки равен project(...).final.
+        """
+        require_numpy()
+        initial = np.asarray(initial, dtype=np.float64)
+        div_yield = np.asarray(div_yield, dtype=np.float64)
+        horizon = np.asarray(horizon, dtype=np.intp)
+        reinvest = np.asarray(reinvest, dtype=np.intp)
+
+        rates = self.table.arrays()[0]
+        years_by_horizon = np.array([HORIZON_YEARS[h] for h in self.horizons], dtype=np.float64)
+        freq_by_type = np.array([self._reinvest_freq[t] for t in self.reinvest_types], dtype=np.float64)
+
+        category = np.searchsorted(CATEGORY_BOUNDS, initial, side="right")
+        r = rates[horizon, category, reinvest]
+        m = freq_by_type[reinvest]
+        per_year = np.ones_like(m) if yearly else m
+        periods = (years_by_horizon[horizon] * per_year).astype(np.intp)
+        width = int(periods.max(initial=0)) + 1
+        k = np.arange(width, dtype=np.float64)
+
+        # Рост с реинвестированием: бегущее произведение множителя за столбец
+        step = 1 + (r / 100) / m
+        if yearly:
+            step = step ** m
+        growth = np.empty((len(initial), width))
+        growth[:, 0] = 1
+        growth[:, 1:] = step[:, None]
+        np.cumprod(growth, axis=1, out=growth)
+
+        # Без реинвестирования — линейный рост по прошедшим годам
+        linear = 1 + (r / 100 - div_yield / 100)[:, None] * (k / per_year[:, None])
+        no_reinvest = reinvest == self.reinvest_types.index(NO_REINVEST)
+
+        values = initial[:, None] * np.where(no_reinvest[:, None], linear, growth)
+        values[np.arange(len(initial)), periods] = self.project(initial, horizon, reinvest, div_yield).final
+        values[k > periods[:, None]] = np.nan
+        values[initial < MIN_INVESTMENT] = np.nan
+        return values
+
+    def codes(self, labels: Sequence[str], vocabulary: Sequence[str]) -> "np.ndarray":
+        """Метки (горизонты или типы реинвестирования) → массив индексов"""
+        require_numpy()
+        index = {label: i for i, label in enumerate(vocabulary)}
+        return np.fromiter((index[label] for label in labels), dtype=np.intp, count=len(labels))
+
+    def project(self, initial, horizon, reinvest, div_yield) -> ProjectionBatch:
+        """Векторный расчёт для массивов портфелей за один проход.
+
+        horizon и reinvest — индексы в self.horizons и self.reinvest_types
+        (см. codes), initial и div_yield — суммы в рублях и доходности в %.
+        """
+        require_numpy()
+        initial = np.asarray(initial, dtype=np.float64)
+        div_yield = np.asarray(div_yield, dtype=np.float64)
+        horizon = np.asarray(horizon, dtype=np.intp)
+        reinvest = np.asarray(reinvest, dtype=np.intp)
+
+        rates, growths, effectives = self.table.arrays()
+        years_by_horizon = np.array([HORIZON_YEARS[h] for h in self.horizons], dtype=np.float64)
+
+        category = np.searchsorted(CATEGORY_BOUNDS, initial, side="right")
+        r = rates[horizon, category, reinvest]
+        years = years_by_horizon[horizon]
+
+        simple = 1 + (r / 100 - div_yield / 100) * years
+        no_reinvest = reinvest == self.reinvest_types.index(NO_REINVEST)
+
+        final = initial * np.where(no_reinvest, simple, growths[horizon, category, reinvest])
+        effective = np.where(no_reinvest, r - div_yield, effectives[horizon, category, reinvest])
+        valid = initial >= MIN_INVESTMENT
+        final = np.where(valid, final, np.nan)
+        effective = np.where(valid, effective, np.nan)
+        return ProjectionBatch(category, r, final, final - initial, effective, valid)
+
+    def simulate(self, paths: int, volatility: float = 0.18, reinvest_type: str = "Ежедневно",
+                 div_yield: float = 0.0, percentiles: Sequence[float] = (5, 25, 50, 75, 95),
+                 seed: Optional[int] = None, workers: int = 1,
+                 chunk_paths: int = 250000) -> SimulationResult:
+        """Моделирование Монте-Карло вокруг ожидаемой доходности из таблицы.
+
+        Доходность каждого периода (m в год по типу реинвестирования) —
+        логнормальная со средним (1 + r/m), как в детерминированном расчёте,
+        и годовой волатильностью volatility. Сумма нормальных шоков периодов
+        за год распределена точно так же, как один шок с годовой дисперсией,
+        поэтому путь разыгрывает по шоку на год (см. _simulate_chunk):
+        стоимость — paths · 15 шоков при любом m. Дрейф ячейки (горизонт,
+        категория) от шоков не зависит, поэтому шоки пути общие для всех
+        ячеек, а перцентили суммы шоков переводятся в стоимость для каждой
+        ячейки. Без реинвестирования (m = 1) годовые приросты складываются,
+        как в project_one. Пачки путей можно раздать пулу процессов; при
+        одном seed результат не зависит от workers. Те же перцентили без
+        розыгрыша даёт percentiles.
+        """
+        require_numpy()
+        years = [HORIZON_YEARS[h] for h in self.horizons]
+        sizes = [min(chunk_paths, paths - start) for start in range(0, paths, chunk_paths)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        tasks = [(chunk_seed, size, years) for chunk_seed, size in zip(seeds, sizes)]
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                hist = sum(pool.map(_simulate_chunk, tasks))
+        else:
+            hist = sum(map(_simulate_chunk, tasks))
+
+        qs = np.asarray(percentiles, dtype=np.float64) / 100
+        u = np.stack([_hist_quantiles(h, qs) for h in hist])               # [горизонт, перцентиль]
+        factors = self._percentile_factors(u, volatility, reinvest_type, div_yield)
+        return SimulationResult(reinvest_type, volatility, paths, tuple(percentiles), factors)
+
+    def percentiles(self, volatility: float = 0.18, reinvest_type: str = "Ежедневно",
+                    div_yield: float = 0.0,
+                    percentiles: Sequence[float] = (5, 25, 50, 75, 95)) -> SimulationResult:
+        """Перцентили той же модели, что и simulate, в замкнутой форме (без путей):
+        сумма нормальных шоков нормальна, поэтому её квантили — квантили N(0, 1)"""
+        require_numpy()
+        normal = NormalDist()
+        u = np.array([normal.inv_cdf(p / 100) for p in percentiles], dtype=np.float64)
+        u = np.broadcast_to(u, (len(self.horizons), len(u)))
+        factors = self._percentile_factors(u, volatility, reinvest_type, div_yield)
+        return SimulationResult(reinvest_type, volatility, 0, tuple(percentiles), factors)
+
+    def _percentile_factors(self, u: "np.ndarray", volatility: float, reinvest_type: str,
+                            div_yield: float) -> "np.ndarray":
+        """Множители роста [горизонт, категория, перцентиль] по квантилям u
+        нормированной суммы шоков [горизонт, перцентиль]"""
+        years = [HORIZON_YEARS[h] for h in self.horizons]
+        r = np.array([[self.expected_returns[h][c] for c in CATEGORIES] for h in self.horizons]) / 100
+        y = np.array(years, dtype=np.float64)[:, None]
+        spread = volatility * np.sqrt(y)[:, :, None] * u[:, None, :]
+        if reinvest_type == NO_REINVEST:
+            return 1 + ((r - div_yield / 100) * y)[:, :, None] + spread
+        m = self.reinvest_freq[reinvest_type]
+        log_mean = (m * np.log1p(r / m) - volatility ** 2 / 2) * y
+        return np.exp(log_mean[:, :, None] + spread)
+
+
+# Столбцы входного CSV для пакетного расчёта и добавляемые столбцы результата
+SCORE_INPUT_COLUMNS = ("initial", "horizon", "reinvest", "div_yield")
+SCORE_RESULT_COLUMNS = ("category", "rate", "final", "profit", "effective", "status")
+STATUS_OK = "ok"
+STATUS_BELOW_MINIMUM = "Минимальная сумма инвестиций — 30 000 ₽"
+STATUS_BAD_INPUT = "Ошибка ввода: проверьте числа"
+
+
+def score_chunk(model: GrowthModel, rows: List[Dict[str, str]]) -> Dict[str, list]:
+    """Расчёт пачки строк CSV с той же проверкой ввода, что и в окне калькулятора.
+
+    Возвращает столбцы: исходные поля как строки и результат; для строк
+    с ошибкой числовые поля пустые (None), причина — в status.
+    """
+    n = len(rows)
+    columns: Dict[str, list] = {name: [row.get(name) for row in rows] for name in SCORE_INPUT_COLUMNS}
+    initial, div_yield, horizon, reinvest = [0.0] * n, [0.0] * n, [0] * n, [0] * n
+    status = [STATUS_OK] * n
+    horizon_codes = {h: i for i, h in enumerate(model.horizons)}
+    reinvest_codes = {t: i for i, t in enumerate(model.reinvest_types)}
+    for i, row in enumerate(rows):
+        try:
+            initial[i] = parse_amount(row["initial"])
+            div_yield[i] = parse_amount(row["div_yield"])
+            horizon[i] = horizon_codes[row["horizon"].strip()]
+            reinvest[i] = reinvest_codes[row["reinvest"].strip()]
+        except (ValueError, KeyError, AttributeError):
+            status[i] = STATUS_BAD_INPUT
+            initial[i] = 0.0
+            continue
+        if initial[i] < MIN_INVESTMENT:
+            status[i] = STATUS_BELOW_MINIMUM
+
+    if np is not None:
+        batch = model.project(initial, horizon, reinvest, div_yield)
+        results = zip(batch.category.tolist(), batch.rate.tolist(), batch.final.tolist(),
+                      batch.profit.tolist(), batch.effective.tolist())
+    else:
+        results = []
+        for i in range(n):
+            if status[i] != STATUS_OK:
+                results.append((0, nan, nan, nan, nan))
+                continue
+            p = model.project_one(initial[i], model.horizons[horizon[i]],
+                                  model.reinvest_types[reinvest[i]], div_yield[i])
+            results.append((category_index(initial[i]), p.rate, p.final, p.profit, p.effective))
+
+    for name in SCORE_RESULT_COLUMNS[:-1]:
+        columns[name] = []
+    for ok, (category, rate, final, profit, effective) in zip((s == STATUS_OK for s in status), results):
+        columns["category"].append(CATEGORIES[category] if ok else None)
+        columns["rate"].append(rate if ok else None)
+        columns["final"].append(final if ok else None)
+        columns["profit"].append(profit if ok else None)
+        columns["effective"].append(effective if ok else None)
+    columns["status"] = status
+    return columns
+
+
+def iter_score_chunks(model: GrowthModel, rows: Iterable[Dict[str, str]],
+                      chunk_rows: int = 100000) -> Iterator[Dict[str, list]]:
+    """Потоковый расчёт: в памяти одновременно только одна пачка строк"""
+    it = iter(rows)
+    while True:
+        chunk = list(islice(it, chunk_rows))
+        if not chunk:
+            return
+        yield score_chunk(model, chunk)
+
+
+def _csv_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return value
+
+
+def score_csv(model: GrowthModel, input_path: str, output_path: str, fmt: str = "csv",
+              chunk_rows: int = 100000, delimiter: str = ",") -> Tuple[int, int, float]:
+    """Пакетный расчёт CSV-файла портфелей в CSV или Parquet.
+
+    Возвращает (строк, строк с ошибками, секунд).
+    """
+    columns = SCORE_INPUT_COLUMNS + SCORE_RESULT_COLUMNS
+    rows = errors = 0
+    start = time.perf_counter()
+    with open(input_path, newline="", encoding="utf-8") as src:
+        reader = csv.DictReader(src, delimiter=delimiter)
+        missing = [c for c in SCORE_INPUT_COLUMNS if c not in (reader.fieldnames or ())]
+        if missing:
+            raise ValueError(f"Во входном файле нет столбцов: {', '.join(missing)}")
+        chunks = iter_score_chunks(model, reader, chunk_rows)
+
+        if fmt == "csv":
+            with open(output_path, "w", newline="", encoding="utf-8") as dst:
+                writer = csv.writer(dst, delimiter=delimiter)
+                writer.writerow(columns)
+                for chunk in chunks:
+                    writer.writerows(zip(*([_csv_value(v) for v in chunk[c]] for c in columns)))
+                    rows += len(chunk["status"])
+                    errors += sum(s != STATUS_OK for s in chunk["status"])
+        elif fmt == "parquet":
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError("Для записи Parquet нужен пакет pyarrow")
+            schema = pa.schema([(c, pa.string()) for c in SCORE_INPUT_COLUMNS + ("category",)]
+                               + [(c, pa.float64()) for c in ("rate", "final", "profit", "effective")]
+                               + [("status", pa.string())])
+            with pq.ParquetWriter(output_path, schema) as writer:
+                for chunk in chunks:
+                    writer.write_table(pa.table(chunk, schema=schema))
+                    rows += len(chunk["status"])
+                    errors += sum(s != STATUS_OK for s in chunk["status"])
+        else:
+            raise ValueError(f"Неизвестный формат вывода: {fmt}")
+    return rows, errors, time.perf_counter() - start
+
+
+def format_report(model: GrowthModel, initial_text: str, horizon: str, reinvest_type: str,
+                  dividend_text: str) -> Tuple[str, str]:
+    """Текст результата для окна калькулятора и его цвет (без обращения к Tk)"""
+    try:
+        initial = parse_amount(initial_text)
+        div_yield = parse_amount(dividend_text)
+
+        if initial < MIN_INVESTMENT:
+            return STATUS_BELOW_MINIMUM, "red"
+
+        p = model.project_one(initial, horizon, reinvest_type, div_yield)
+
+        # Формируем красивый вывод
+        return (f"Категория суммы: {p.category}\n"
+                f"Горизонт: {horizon}\n"
+                f"Ожидаемая доходность: {p.rate:.2f} % годовых\n"
+                f"Дивидендная доходность: {div_yield:.2f} %\n"
+                f"Реинвестирование: {reinvest_type}\n"
+                f"Периодов в год: {p.periods_per_year}\n"
+                + "─" * 38 + "\n"
+                f"Начальная сумма:   {initial:,.0f} ₽\n"
+                f"Ожидаемая прибыль:  {p.profit:,.0f} ₽\n"
+                f"Итоговая стоимость: {p.final:,.0f} ₽\n"
+                f"Эффективная доходность: {p.effective:.2f} % годовых\n"), "#006400"  # тёмно-зелёный для успеха
+
+    except ValueError:
+        return STATUS_BAD_INPUT, "red"
+    except Exception as e:
+        return f"Ошибка: {str(e)}", "red"
 
 
 class InvestmentGrowthCalculator:
+    """Окно калькулятора. Расчёт идёт в фоновом потоке и запускается сам
+    через DEBOUNCE_MS после последнего изменения полей; результаты
+    устаревших запусков отбрасываются."""
+    DEBOUNCE_MS = 250
+    POLL_MS = 15
+
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("Калькулятор роста инвестиций в акции")
-        self.root.geometry("450x500")
+        self.root.geometry("450x530")
         self.root.configure(bg="#f0f4f8")
 
-        # Среднегодовая ожидаемая доходность акций (в %)
-        self.expected_returns = {
-            "1 год": {"до 300 тыс.": 9.5, "300–800 тыс.": 10.0, "800 тыс.–2 млн": 10.5, "свыше 2 млн": 11.0},
-            "3 года": {"до 300 тыс.": 10.0, "300–800 тыс.": 10.8, "800 тыс.–2 млн": 11.3, "свыше 2 млн": 11.8},
-            "5 лет": {"до 300 тыс.": 10.5, "300–800 тыс.": 11.2, "800 тыс.–2 млн": 11.8, "свыше 2 млн": 12.5},
-            "7 лет": {"до 300 тыс.": 11.0, "300–800 тыс.": 11.7, "800 тыс.–2 млн": 12.3, "свыше 2 млн": 13.0},
-            "10 лет": {"до 300 тыс.": 11.5, "300–800 тыс.": 12.2, "800 тыс.–2 млн": 12.8, "свыше 2 млн": 13.5},
-            "15+ лет": {"до 300 тыс.": 12.0, "300–800 тыс.": 12.7, "800 тыс.–2 млн": 13.3, "свыше 2 млн": 14.0}
-        }
-
-        # Частота реинвестирования дивидендов (примерно соответствует периодам)
-        self.reinvest_freq = {
-            "Без реинвестирования": 1,
-            "Ежегодно": 1,
-            "Ежеквартально": 4,
-            "Ежемесячно": 12,
-            "Ежедневно": 365
-        }
+        self.model = GrowthModel()
+        self.expected_returns = self.model.expected_returns
+        self.reinvest_freq = self.model.reinvest_freq
+
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.results: "queue.Queue[Tuple[int, str, str, float]]" = queue.Queue()
+        self.job_id = 0
+        self.job: Optional[Future] = None
+        self.debounce_id = None
+        self.polling = False
 
         self.create_interface()
+        self.compute_growth()
 
     def create_interface(self):
         frame = tk.Frame(self.root, bg="#f0f4f8")
@@ -64,86 +652,98 @@ class InvestmentGrowthCalculator:
         self.result_text = tk.Text(frame, height=12, width=50, wrap="word", font=("Consolas", 10), bg="#ffffff", relief="flat", bd=1)
         self.result_text.pack(pady=10, fill="x")
 
+        # Задержки: расчёт в фоне и отрисовка результата
+        self.latency_label = tk.Label(frame, text="", bg="#f0f4f8", fg="gray", font=("Arial", 9))
+        self.latency_label.pack(anchor="e")
+
+        # Пересчёт на лету при изменении любого поля
+        self.initial_entry.bind("<KeyRelease>", self.schedule_recalc)
+        self.dividend_entry.bind("<KeyRelease>", self.schedule_recalc)
+        self.horizon_var.trace_add("write", self.schedule_recalc)
+        self.reinvest_var.trace_add("write", self.schedule_recalc)
+
         self.root.protocol("WM_DELETE_WINDOW", self.root.quit)
 
+    def schedule_recalc(self, *args):
+        """Отложенный пересчёт: каждое новое изменение сдвигает запуск"""
+        if self.debounce_id is not None:
+            self.root.after_cancel(self.debounce_id)
+        self.debounce_id = self.root.after(self.DEBOUNCE_MS, self.compute_growth)
+
     def compute_growth(self):
-        try:
-            initial = float(self.initial_entry.get().replace(" ", "").replace(",", "."))
-            horizon = self.horizon_var.get()
-            reinvest_type = self.reinvest_var.get()
-            div_yield = float(self.dividend_entry.get().replace(" ", "").replace(",", "."))
-
-            if initial < 30000:
-                self.result_text.delete("1.0", tk.END)
-                self.result_text.insert(tk.END, "Минимальная сумма инвестиций — 30 000 ₽")
-                self.result_text.config(fg="red")
-                return
-
-            # Определение категории суммы
-            if initial < 300000:
-                category = "до 300 тыс."
-            elif initial <= 800000:
-                category = "300–800 тыс."
-            elif initial <= 2000000:
-                category = "800 тыс.–2 млн"
-            else:
-                category = "свыше 2 млн"
-
-            # Среднегодовая ожидаемая доходность (включая рост цены и дивиденды)
-            r = self.expected_returns[horizon][category]  # в %
-
-            # Длительность в годах
-            years = {"1 год": 1, "3 года": 3, "5 лет": 5, "7 лет": 7, "10 лет": 10, "15+ лет": 15}[horizon]
-
-            # Частота реинвестирования
-            m = self.reinvest_freq[reinvest_type]
-
-            # Дивидендная доходность в расчётах (часть общей доходности)
-            div_rate = div_yield / 100
-
-            # Эффективная доходность с реинвестированием
-            if reinvest_type == "Без реинвестирования":
-                # Только рост цены без реинвестирования дивидендов
-                final = initial * (1 + (r / 100 - div_rate) * years)
-                profit = final - initial
-                effective = (r - div_yield)
-            else:
-                # Полная капитализация (рост + реинвестированные дивиденды)
-                rate_per_period = (r / 100) / m
-                periods = m * years
-                final = initial * pow(1 + rate_per_period, periods)
-                profit = final - initial
-                effective = (pow(1 + rate_per_period, periods) - 1) * 100 / years
-
-            # Формируем красивый вывод
-            self.result_text.delete("1.0", tk.END)
-            self.result_text.insert(tk.END, f"Категория суммы: {category}\n")
-            self.result_text.insert(tk.END, f"Горизонт: {horizon}\n")
-            self.result_text.insert(tk.END, f"Ожидаемая доходность: {r:.2f} % годовых\n")
-            self.result_text.insert(tk.END, f"Дивидендная доходность: {div_yield:.2f} %\n")
-            self.result_text.insert(tk.END, f"Реинвестирование: {reinvest_type}\n")
-            self.result_text.insert(tk.END, f"Периодов в год: {m}\n")
-            self.result_text.insert(tk.END, "─" * 38 + "\n")
-            self.result_text.insert(tk.END, f"Начальная сумма:   {initial:,.0f} ₽\n")
-            self.result_text.insert(tk.END, f"Ожидаемая прибыль:  {profit:,.0f} ₽\n")
-            self.result_text.insert(tk.END, f"Итоговая стоимость: {final:,.0f} ₽\n")
-            self.result_text.insert(tk.END, f"Эффективная доходность: {effective:.2f} % годовых\n")
-
-            self.result_text.config(fg="#006400")  # тёмно-зелёный для успеха
-
-        except ValueError:
-            self.result_text.delete("1.0", tk.END)
-            self.result_text.insert(tk.END, "Ошибка ввода: проверьте числа")
-            self.result_text.config(fg="red")
-        except Exception as e:
-            self.result_text.delete("1.0", tk.END)
-            self.result_text.insert(tk.END, f"Ошибка: {str(e)}")
-            self.result_text.config(fg="red")
+        """Запуск расчёта в фоновом потоке; поля читаются здесь, в потоке Tk"""
+        self.debounce_id = None
+        inputs = (self.initial_entry.get(), self.horizon_var.get(),
+                  self.reinvest_var.get(), self.dividend_entry.get())
+        if self.job is not None:
+            self.job.cancel()  # ещё не начатый устаревший расчёт не нужен
+        self.job_id += 1
+        self.job = self.executor.submit(self._compute, self.job_id, inputs)
+        if not self.polling:
+            self.polling = True
+            self.root.after(self.POLL_MS, self._poll_results)
+
+    def _compute(self, job_id: int, inputs: Tuple[str, str, str, str]):
+        start = time.perf_counter()
+        text, color = format_report(self.model, *inputs)
+        self.results.put((job_id, text, color, time.perf_counter() - start))
+
+    def _poll_results(self):
+        """Забрать готовые результаты из очереди (в потоке Tk) и показать последний"""
+        finished = self.job.done()  # до чтения очереди: готовый результат уже в ней
+        latest = None
+        while not self.results.empty():
+            result = self.results.get_nowait()
+            if result[0] == self.job_id:
+                latest = result
+        if latest is not None:
+            self._render(*latest[1:])
+        if latest is None and not finished:
+            self.root.after(self.POLL_MS, self._poll_results)
+        else:
+            self.polling = False
+
+    def _render(self, text: str, color: str, compute_time: float):
+        start = time.perf_counter()
+        self.result_text.delete("1.0", tk.END)
+        self.result_text.insert(tk.END, text)
+        self.result_text.config(fg=color)
+        render_time = time.perf_counter() - start
+        self.latency_label.config(
+            text=f"расчёт: {compute_time * 1000:.2f} мс, отрисовка: {render_time * 1000:.2f} мс")
 
     def run(self):
         self.root.mainloop()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Калькулятор роста инвестиций. Без аргументов — окно.")
+    commands = parser.add_subparsers(dest="command")
+    score = commands.add_parser("score", help="пакетный расчёт CSV портфелей",
+                                description="Входной CSV со столбцами " + ", ".join(SCORE_INPUT_COLUMNS))
+    score.add_argument("input")
+    score.add_argument("output")
+    score.add_argument("--format", choices=("csv", "parquet"),
+                       help="по умолчанию — по расширению выходного файла")
+    score.add_argument("--chunk-rows", type=int, default=100000)
+    score.add_argument("--delimiter", default=",")
+    score.add_argument("--tables", help="JSON с таблицами доходностей и частот")
+    args = parser.parse_args()
+
+    if args.command != "score":
+        calc = InvestmentGrowthCalculator()
+        calc.run()
+        return
+
+    model = GrowthModel()
+    if args.tables:
+        model.load_tables(args.tables)
+    fmt = args.format or ("parquet" if args.output.endswith(".parquet") else "csv")
+    rows, errors, elapsed = score_csv(model, args.input, args.output, fmt, args.chunk_rows, args.delimiter)
+    print(f"Обработано строк: {rows:,} (с ошибками: {errors:,}) за {elapsed:.2f} с — "
+          f"{rows / max(elapsed, 1e-9):,.0f} строк/с", file=sys.stderr)
 
 
 if __name__ == "__main__":
-    calc = InvestmentGrowthCalculator()
-    calc.run()
+    main()
@@ -0,0 +1,122 @@
+"""Замеры производительности преобразователей времени
+
+Запуск:
+    python benchmark.py convert-many [--count 10000000]
+    python benchmark.py human [--count 10000000] [--distinct 5000]
+"""
+import argparse
+import io
+import time
+from array import array
+from datetime import timedelta
+from random import Random
+
+from lab3 import (ComposedConverter, ToDays, ToHours, ToHumanReadable, ToMinutes, ToSeconds, ToWeeks,
+                  format_duration)
+
+
+def make_durations(count: int, seed: int = 1) -> array:
+    """Синтетические длительности до 30 дней"""
+    rng = Random(seed)
+    return array("q", (rng.randrange(30 * 86400) for _ in range(count)))
+
+
+def bench_convert_many(count: int):
+    converters = [ToSeconds(), ToMinutes(), ToHours(), ToDays(), ToWeeks(), ToHumanReadable()]
+    values = make_durations(count)
+    print(f"{count:,} значений")
+    print(f"{'Преобразование':<26}  {'Цикл, с':>8}  {'Пакетом, с':>10}  {'Ускорение':>9}")
+    print("─" * 60)
+    for conv in converters:
+        # Поэлементно — как в main
+        start = time.perf_counter()
+        for v in values:
+            conv.convert(v)
+        loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        conv.convert_many(values)
+        bulk = time.perf_counter() - start
+        print(f"{conv.get_operation_name():<26}  {loop:>8.2f}  {bulk:>10.3f}  {loop / bulk:>8.1f}x")
+
+    # Все единицы с делителем сразу: цепочка делений с общими частными
+    units = converters[:-1]
+    start = time.perf_counter()
+    for conv in units:
+        conv.convert_many(values)
+    separate = time.perf_counter() - start
+    start = time.perf_counter()
+    ComposedConverter(units).convert_many(values)
+    composed = time.perf_counter() - start
+    print(f"{'Сек–недели, цепочкой':<26}  {separate:>8.3f}  {composed:>10.3f}  {separate / composed:>8.1f}x")
+
+
+def timedelta_format(total_seconds: int) -> str:
+    """Прежняя реализация ToHumanReadable.convert — для сравнения"""
+    td = timedelta(seconds=total_seconds)
+    days = td.days
+    hours, remainder = divmod(td.seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    parts = []
+    if days:
+        parts.append(f"{days} дн")
+    if hours:
+        parts.append(f"{hours} ч")
+    if minutes:
+        parts.append(f"{minutes} мин")
+    if seconds or not parts:
+        parts.append(f"{seconds} сек")
+    return " ".join(parts)
+
+
+def bench_human(count: int, distinct: int):
+    rng = Random(1)
+    pool = [rng.randrange(30 * 86400) for _ in range(distinct)]
+    values = array("q", (rng.choice(pool) for _ in range(count)))
+    conv = ToHumanReadable()
+    print(f"{count:,} значений, различных: {distinct:,}")
+    print(f"{'Способ':<30}  {'Время, с':>9}  {'Значений/с':>14}")
+    print("─" * 58)
+
+    def run(name, job):
+        format_duration.cache_clear()
+        start = time.perf_counter()
+        job()
+        elapsed = time.perf_counter() - start
+        print(f"{name:<30}  {elapsed:>9.2f}  {count / elapsed:>14,.0f}")
+
+    def timedelta_loop():
+        out = io.StringIO()
+        for v in values:
+            out.write(timedelta_format(v) + "\n")
+
+    def convert_loop():
+        out = io.StringIO()
+        for v in values:
+            out.write(conv.convert(v) + "\n")
+
+    run("timedelta, по одному", timedelta_loop)
+    run("convert, по одному", convert_loop)
+    run("write_many", lambda: conv.write_many(values, io.StringIO()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки преобразователей времени")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert_many = commands.add_parser("convert-many", help="convert_many против поэлементного convert")
+    convert_many.add_argument("--count", type=int, default=10_000_000)
+
+    human = commands.add_parser("human", help="форматирование ToHumanReadable")
+    human.add_argument("--count", type=int, default=10_000_000)
+    human.add_argument("--distinct", type=int, default=5000, help="различных длительностей")
+
+    args = parser.parse_args()
+    if args.command == "convert-many":
+        bench_convert_many(args.count)
+    elif args.command == "human":
+        bench_human(args.count, args.distinct)
+
+
+if __name__ == "__main__":
+    main()
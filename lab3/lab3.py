@@ -1,9 +1,42 @@
 import abc
-from datetime import timedelta
+import argparse
+import sys
+import time
+from array import array
+from functools import lru_cache
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, TextIO, Tuple, Type
+
+try:
+    import numpy as np
+except ImportError:  # convert_many работает и без numpy, но поэлементно
+    np = None
+
+
+def floor_divide(values, divisor: int):
+    """Целочисленное деление массива секунд за один проход: с numpy — numpy-массив,
+    без него — array того же типа"""
+    if np is not None:
+        return np.floor_divide(np.asarray(values), divisor)
+    typecode = values.typecode if isinstance(values, array) else "q"
+    return array(typecode, [v // divisor for v in values])
+
+
+# Реестр преобразователей по имени единицы (ключ unit класса). Подклассы
+# TimeConverter с unit попадают сюда сами — так подключаются новые единицы
+CONVERTERS: Dict[str, Type["TimeConverter"]] = {}
 
 
 class TimeConverter(abc.ABC):
     """Абстрактный класс для преобразования времени"""
+    # Имя в реестре CONVERTERS (например, для --units); None — не регистрировать
+    unit: Optional[str] = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "unit" in cls.__dict__ and cls.unit is not None:
+            CONVERTERS[cls.unit] = cls
+
     @abc.abstractmethod
     def get_operation_name(self) -> str:
         pass
@@ -12,13 +45,39 @@ class TimeConverter(abc.ABC):
     def get_symbol(self) -> str:
         pass
 
+    # Сколько секунд в единице: для таких преобразований convert_many делит весь
+    # массив за один проход. None — результат не сводится к делению
+    divisor: Optional[int] = None
+
     @abc.abstractmethod
     def convert(self, total_seconds: int) -> int:
         """Преобразование общего количества секунд в нужную единицу"""
         pass
 
+    def bulk_divisor(self) -> Optional[int]:
+        """divisor, если им можно заменить convert: convert не переопределён
+        после класса, задавшего divisor (подкласс ToMinutes со своим convert
+        получает None — деление пачкой обошло бы его convert)"""
+        owner = next(cls for cls in type(self).__mro__ if "divisor" in cls.__dict__)
+        return self.divisor if type(self).convert is owner.convert else None
+
+    def convert_many(self, values):
+        """Преобразование массива секунд (array, numpy или любая последовательность).
+
+        Если есть bulk_divisor, весь массив делится нацело за один проход: с
+        numpy результат — numpy-массив, без него — array того же типа. Иначе
+        (например, у сторонних подклассов) — список результатов convert.
+        """
+        divisor = self.bulk_divisor()
+        if divisor is None:
+            return [self.convert(int(v)) for v in values]
+        return floor_divide(values, divisor)
+
 
 class ToSeconds(TimeConverter):
+    unit = "seconds"
+    divisor = 1
+
     def get_operation_name(self) -> str:
         return "Перевод в секунды"
 
@@ -30,6 +89,9 @@ class ToSeconds(TimeConverter):
 
 
 class ToMinutes(TimeConverter):
+    unit = "minutes"
+    divisor = 60
+
     def get_operation_name(self) -> str:
         return "Перевод в минуты"
 
@@ -41,6 +103,9 @@ class ToMinutes(TimeConverter):
 
 
 class ToHours(TimeConverter):
+    unit = "hours"
+    divisor = 3600
+
     def get_operation_name(self) -> str:
         return "Перевод в часы"
 
@@ -52,6 +117,9 @@ class ToHours(TimeConverter):
 
 
 class ToDays(TimeConverter):
+    unit = "days"
+    divisor = 86400
+
     def get_operation_name(self) -> str:
         return "Перевод в дни"
 
@@ -63,6 +131,9 @@ class ToDays(TimeConverter):
 
 
 class ToWeeks(TimeConverter):
+    unit = "weeks"
+    divisor = 604800
+
     def get_operation_name(self) -> str:
         return "Перевод в недели"
 
@@ -73,8 +144,92 @@ class ToWeeks(TimeConverter):
         return total_seconds // 604800
 
 
+class ToMonths(TimeConverter):
+    """Средний месяц григорианского календаря — 30,436875 дня"""
+    unit = "months"
+    divisor = 2629746
+
+    def get_operation_name(self) -> str:
+        return "Перевод в месяцы"
+
+    def get_symbol(self) -> str:
+        return "мес"
+
+    def convert(self, total_seconds: int) -> int:
+        return total_seconds // 2629746
+
+
+class ToYears(TimeConverter):
+    """Средний год григорианского календаря — 365,2425 дня"""
+    unit = "years"
+    divisor = 31556952
+
+    def get_operation_name(self) -> str:
+        return "Перевод в годы"
+
+    def get_symbol(self) -> str:
+        return "г"
+
+    def convert(self, total_seconds: int) -> int:
+        return total_seconds // 31556952
+
+
+class ToMilliseconds(TimeConverter):
+    unit = "ms"
+
+    def get_operation_name(self) -> str:
+        return "Перевод в миллисекунды"
+
+    def get_symbol(self) -> str:
+        return "мс"
+
+    def convert(self, total_seconds: int) -> int:
+        return total_seconds * 1000
+
+    def convert_many(self, values):
+        """Умножение пачки на 1000. Если результат не помещается в int64
+        (секунд больше INT64_MAX // 1000), пачка считается в int Python —
+        numpy переполнился бы молча"""
+        if np is not None:
+            arr = np.asarray(values)
+            limit = INT64_MAX // 1000
+            if not len(arr) or (arr.max() <= limit and arr.min() >= -limit):
+                return arr * 1000
+            return [v * 1000 for v in arr.tolist()]
+        typecode = values.typecode if isinstance(values, array) else "q"
+        try:
+            return array(typecode, [v * 1000 for v in values])
+        except OverflowError:
+            return [v * 1000 for v in values]
+
+
+# Сколько разных длительностей помнит format_duration: в логах значения
+# сильно повторяются, а строки короткие
+HUMAN_CACHE_SIZE = 1 << 16
+
+
+@lru_cache(maxsize=HUMAN_CACHE_SIZE)
+def format_duration(total_seconds: int) -> str:
+    """Строка вида «1 дн 2 ч 3 мин 4 сек» без нулевых частей"""
+    days, remainder = divmod(total_seconds, 86400)
+    hours, remainder = divmod(remainder, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    parts = []
+    if days:
+        parts.append(f"{days} дн")
+    if hours:
+        parts.append(f"{hours} ч")
+    if minutes:
+        parts.append(f"{minutes} мин")
+    if seconds or not parts:
+        parts.append(f"{seconds} сек")
+    return " ".join(parts)
+
+
 class ToHumanReadable(TimeConverter):
     """Читаемый формат: дни, часы, минуты, секунды"""
+    unit = "human"
+
     def get_operation_name(self) -> str:
         return "Человеко-читаемый формат"
 
@@ -82,20 +237,21 @@ class ToHumanReadable(TimeConverter):
         return "≈"
 
     def convert(self, total_seconds: int) -> str:
-        td = timedelta(seconds=total_seconds)
-        days = td.days
-        hours, remainder = divmod(td.seconds, 3600)
-        minutes, seconds = divmod(remainder, 60)
-        parts = []
-        if days:
-            parts.append(f"{days} дн")
-        if hours:
-            parts.append(f"{hours} ч")
-        if minutes:
-            parts.append(f"{minutes} мин")
-        if seconds or not parts:
-            parts.append(f"{seconds} сек")
-        return " ".join(parts)
+        return format_duration(total_seconds)
+
+    def convert_many(self, values) -> List[str]:
+        """Строки для массива секунд. С numpy каждое различное значение
+        форматируется один раз за пачку, остальные берутся по индексу"""
+        if np is not None and len(values):
+            distinct, inverse = np.unique(np.asarray(values), return_inverse=True)
+            texts = [format_duration(v) for v in distinct.tolist()]
+            return [texts[i] for i in inverse.tolist()]
+        return [format_duration(int(v)) for v in values]
+
+    def write_many(self, values, out: TextIO, end: str = "\n"):
+        """Запись строк для массива секунд в out одним вызовом write"""
+        if len(values):
+            out.write(end.join(self.convert_many(values)) + end)
 
 
 def read_duration() -> int:
@@ -117,37 +273,229 @@ def read_duration() -> int:
             print("Введите корректное целое число")
 
 
-def main():
-    converters = [
-        ToSeconds(),
-        ToMinutes(),
-        ToHours(),
-        ToDays(),
-        ToWeeks(),
-        ToHumanReadable()
-    ]
+class ComposedConverter:
+    """Несколько преобразований за один проход по значению или пачке.
+
+    Единицы с bulk_divisor выстраиваются в цепочку по возрастанию делителя:
+    каждая делит уже посчитанное частное ближайшей меньшей единицы, на
+    которую её делитель делится нацело (часы — минуты на 60, недели — дни
+    на 7), поэтому промежуточные частные общие. Остальные преобразователи
+    считаются своим convert / convert_many.
+    """
+    def __init__(self, converters: Sequence[TimeConverter]):
+        self.converters = list(converters)
+        # План цепочки: (позиция, позиция основы или None — исходные секунды, делитель от основы)
+        self.chain: List[Tuple[int, Optional[int], int]] = []
+        done: List[Tuple[int, int]] = []
+        divisors = [c.bulk_divisor() for c in self.converters]
+        for divisor, i in sorted((d, i) for i, d in enumerate(divisors) if d is not None):
+            base = max(((d, j) for d, j in done if divisor % d == 0), default=None)
+            if base is None:
+                self.chain.append((i, None, divisor))
+            else:
+                self.chain.append((i, base[1], divisor // base[0]))
+            done.append((divisor, i))
+        chained = {i for i, _, _ in self.chain}
+        self.others = [i for i in range(len(self.converters)) if i not in chained]
+
+    def convert_one(self, total_seconds: int) -> list:
+        """Результаты всех преобразователей для одного значения; если
+        преобразователь упал, на его месте — исключение, остальные считаются"""
+        results = [None] * len(self.converters)
+        for i, base, step in self.chain:
+            results[i] = (total_seconds if base is None else results[base]) // step
+        for i in self.others:
+            try:
+                results[i] = self.converters[i].convert(total_seconds)
+            except Exception as e:
+                results[i] = e
+        return results
+
+    def convert_many(self, values) -> list:
+        """Столбцы результатов всех преобразователей для массива секунд"""
+        columns = [None] * len(self.converters)
+        for i, base, step in self.chain:
+            source = values if base is None else columns[base]
+            columns[i] = source if step == 1 else floor_divide(source, step)
+        for i in self.others:
+            columns[i] = self.converters[i].convert_many(values)
+        return columns
+
+
+DEFAULT_UNITS = ("seconds", "minutes", "hours", "days", "weeks", "human")
+
+
+def default_converters() -> List[TimeConverter]:
+    return [CONVERTERS[unit]() for unit in DEFAULT_UNITS]
+
+
+# Строк за одну пачку потокового режима: память ограничена размером пачки
+STREAM_CHUNK_LINES = 65536
+INT64_MAX = 2 ** 63 - 1
+
+ErrorCallback = Callable[[int, str, str], None]
+
+
+def parse_chunk(lines: Sequence[str], first_no: int,
+                on_error: Optional[ErrorCallback] = None) -> Tuple[array, Optional[List[int]]]:
+    """Разбор пачки строк с длительностями (по одной на строку, только цифры).
+
+    Возвращает array('q') корректных значений и позиции строк, из которых они
+    взяты (None — корректны все строки). Для остальных вызывается
+    on_error(номер строки, строка, причина).
+    """
+    text = "".join(lines)
+    # Быстрая проверка всей пачки сразу: только цифры ASCII (isdigit пропускает
+    # и «²» и т.п., которые int не разберёт) и непустые строки
+    digits = text.replace("\n", "")
+    if digits.isascii() and digits.isdigit() and "\n\n" not in text and not text.startswith("\n"):
+        try:
+            return array("q", map(int, lines)), None
+        except (OverflowError, ValueError):
+            pass
+
+    values = array("q")
+    positions = []
+    for i, line in enumerate(lines):
+        raw = line.strip()
+        reason = None
+        if not (raw.isascii() and raw.isdigit()):
+            reason = "нужно только положительное целое число"
+        else:
+            try:
+                seconds = int(raw)
+            except ValueError:
+                reason = "введите корректное целое число"
+            else:
+                if seconds > INT64_MAX:
+                    reason = "слишком большое число"
+        if reason is None:
+            values.append(seconds)
+            positions.append(i)
+        elif on_error is not None:
+            on_error(first_no + i, line.rstrip("\n"), reason)
+    return values, positions
+
+
+def format_chunk(values: array, composed: ComposedConverter) -> List[str]:
+    """Строки вывода для пачки: результаты преобразователей через табуляцию"""
+    columns = []
+    for result in composed.convert_many(values):
+        if np is not None and isinstance(result, np.ndarray):
+            result = result.tolist()
+        if not result or not isinstance(result[0], str):
+            result = list(map(str, result))
+        columns.append(result)
+    return list(map("\t".join, zip(*columns)))
+
+
+def stream_durations(sources: Iterable[TextIO], converters: Sequence[TimeConverter], out: TextIO,
+                     chunk_lines: int = STREAM_CHUNK_LINES,
+                     on_error: Optional[ErrorCallback] = None) -> int:
+    """Потоковое преобразование: строка вывода на каждую строку ввода.
+
+    Ввод читается пачками по chunk_lines строк, каждая пачка проходит через
+    все преобразователи за один проход (ComposedConverter) и пишется в out
+    одним вызовом write.
+    Для некорректных строк выводится пустая строка. Возвращает число строк.
+    """
+    composed = ComposedConverter(converters)
+    line_no = 0
+    for source in sources:
+        while True:
+            lines = list(islice(source, chunk_lines))
+            if not lines:
+                break
+            values, positions = parse_chunk(lines, line_no + 1, on_error)
+            rows = format_chunk(values, composed) if len(values) else []
+            if positions is not None:
+                filled = [""] * len(lines)
+                for i, row in zip(positions, rows):
+                    filled[i] = row
+                rows = filled
+            out.write("\n".join(rows) + "\n")
+            line_no += len(lines)
+    return line_no
+
+
+def report_line_error(line_no: int, line: str, reason: str):
+    print(f"Строка {line_no}: {reason}: {line!r}", file=sys.stderr)
+
+
+def main_loop(converters: Optional[Sequence[TimeConverter]] = None):
+    converters = converters or default_converters()
+    composed = ComposedConverter(converters)
 
     print("Калькулятор анализа времени")
     print("Преобразует введённое количество секунд в разные единицы\n")
 
-    total_seconds = read_duration()
+    while True:
+        try:
+            total_seconds = read_duration()
+        except EOFError:  # ввод закончился (Ctrl+D или конец канала)
+            print("\nДо свидания!")
+            break
+
+        print(f"\nИсходное время: {total_seconds:,} секунд")
+        print("─" * 45)
+
+        for conv, result in zip(converters, composed.convert_one(total_seconds)):
+            if isinstance(result, Exception):
+                print(f"{conv.get_operation_name():<25} → Ошибка: {result}")
+            else:
+                print(f"{conv.get_operation_name():<25} → {result} {conv.get_symbol()}")
+
+        print("─" * 45)
+        print("Повторить расчёт? (Enter = да, любой символ + Enter = выход)")
+        try:
+            answer = input()
+        except EOFError:
+            answer = "q"
+        if answer.strip():
+            print("До свидания!")
+            break
 
-    print(f"\nИсходное время: {total_seconds:,} секунд")
-    print("─" * 45)
 
-    for conv in converters:
-        try:
-            result = conv.convert(total_seconds)
-            print(f"{conv.get_operation_name():<25} → {result} {conv.get_symbol()}")
-        except Exception as e:
-            print(f"{conv.get_operation_name():<25} → Ошибка: {e}")
-
-    print("─" * 45)
-    print("Повторить расчёт? (Enter = да, любой символ + Enter = выход)")
-    if input().strip():
-        print("До свидания!")
-    else:
-        main()
+def main():
+    parser = argparse.ArgumentParser(
+        description="Калькулятор анализа времени. Без аргументов — интерактивный режим "
+                    "(если stdin не терминал — читается stdin).")
+    parser.add_argument("files", nargs="*",
+                        help="файлы с длительностями в секундах, по одной на строку; - — stdin")
+    parser.add_argument("--units", default=",".join(DEFAULT_UNITS),
+                        help="единицы через запятую: " + ", ".join(CONVERTERS))
+    parser.add_argument("--chunk-lines", type=int, default=STREAM_CHUNK_LINES)
+    parser.add_argument("--stats", action="store_true", help="скорость обработки в stderr")
+    args = parser.parse_args()
+
+    units = [u.strip() for u in args.units.split(",") if u.strip()]
+    unknown = [u for u in units if u not in CONVERTERS]
+    if unknown or not units:
+        parser.error("неизвестные единицы: " + ", ".join(unknown) if unknown else "не заданы единицы")
+    converters = [CONVERTERS[u]() for u in units]
+
+    if not args.files:
+        if sys.stdin.isatty():
+            main_loop(converters)
+            return
+        args.files = ["-"]  # stdin не терминал (канал или файл) — потоковый режим
+
+    def sources():
+        for name in args.files:
+            if name == "-":
+                yield sys.stdin
+            else:
+                with open(name, encoding="utf-8") as f:
+                    yield f
+
+    start = time.perf_counter()
+    lines = stream_durations(sources(), converters, sys.stdout,
+                             args.chunk_lines, report_line_error)
+    sys.stdout.flush()
+    if args.stats:
+        elapsed = time.perf_counter() - start
+        print(f"{lines:,} строк за {elapsed:.2f} с: {lines / max(elapsed, 1e-9):,.0f} строк/с",
+              file=sys.stderr)
 
 
 if __name__ == "__main__":
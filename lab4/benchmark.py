@@ -0,0 +1,226 @@
+"""Замеры производительности предпросмотра заметок (без окна Tk)
+
+Запуск:
+    python benchmark.py preview [--lines 50000] [--edits 500]   # код выхода 1, если p99 дольше кадра
+    python benchmark.py search [--lines 500000] [--queries 200]
+    python benchmark.py switch [--notes 5000] [--lines 2000] [--switches 200]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from random import Random
+
+from lab4 import (CachedPreview, DirtyLines, IncrementalPreview, NoteEditor, NoteStore, PieceTable,
+                  PreviewLRU, WordIndex, _insert_args, note_version)
+
+FRAME_MS = 16.0
+# Строк в окне предпросмотра: видимые 10 и запас по 30 сверху и снизу
+WINDOW_LINES = 70
+
+
+def make_note(lines: int, seed: int = 1) -> str:
+    """Синтетическая заметка: заголовки, абзацы с выделением, списки и блоки кода"""
+    rng = Random(seed)
+    out = []
+    while len(out) < lines:
+        out.append(f"## Раздел {len(out)}")
+        for _ in range(rng.randint(2, 6)):
+            out.append(f"Текст абзаца с **жирным** и *курсивом*, строка {len(out)} — `код` внутри")
+        out.extend(f"- пункт списка {k}" for k in range(rng.randint(1, 4)))
+        if rng.random() < 0.3:
+            out.append("```")
+            out.extend(f"    x = {k} * y" for k in range(rng.randint(2, 8)))
+            out.append("```")
+        out.append("")
+    return "\n".join(out[:lines])
+
+
+def type_char(document: PieceTable, dirty: DirtyLines, offset: int, char: str):
+    """Вставка символа, как её видит окно через перехват правок виджета"""
+    line = document.text(0, offset).count("\n")
+    document.insert(offset, char)
+    dirty.mark(line, line + 1, line + 1 + char.count("\n"))
+
+
+def render_ms(preview: IncrementalPreview, document: PieceTable, dirty: DirtyLines) -> float:
+    """Время одного обновления, как в окне: разбор изменённых строк (не дальше
+    окна), отрисовка видимых строк вокруг правки и подготовка аргументов
+    вставки (без самого Tk)"""
+    start = time.perf_counter()
+    edit = dirty.take()
+    top = max(0, edit[0] - WINDOW_LINES // 2)
+    end = min(document.line_count, top + WINDOW_LINES)
+    preview.reparse(*edit, document.line_count, document.lines, end)
+    preview.parse_more(end, document.line_count, document.lines)
+    _insert_args(preview.render(top, end, document.lines))
+    return (time.perf_counter() - start) * 1000
+
+
+def idle_ms(preview: IncrementalPreview, document: PieceTable) -> list:
+    """Дозбор за окном порциями, как при простое окна: время каждой порции"""
+    timings = []
+    while preview.parsed < document.line_count:
+        start = time.perf_counter()
+        preview.parse_more(preview.parsed + NoteEditor.PREVIEW_IDLE_LINES, document.line_count, document.lines)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report_idle(timings: list) -> str:
+    if not timings:
+        return "дозбор не нужен"
+    return (f"дозбор при простое: {len(timings)} порций, всего {sum(timings):.1f} мс, "
+            f"макс. порция {max(timings):.1f} мс")
+
+
+def bench_preview(lines: int, edits: int) -> bool:
+    """Возвращает, уложился ли p99 обновления после правки в кадр"""
+    text = make_note(lines)
+    document = PieceTable(text)
+    dirty = DirtyLines()
+    preview = IncrementalPreview()
+    print(f"Заметка: {lines:,} строк, {len(text) / 2**20:.1f} МБ")
+    start = time.perf_counter()
+    preview.reset(document.line_count)
+    preview.parse_more(WINDOW_LINES, document.line_count, document.lines)
+    _insert_args(preview.render(0, min(document.line_count, WINDOW_LINES), document.lines))
+    print(f"Первая отрисовка: {(time.perf_counter() - start) * 1000:.1f} мс; "
+          f"{report_idle(idle_ms(preview, document))}")
+
+    rng = Random(2)
+    timings = []
+    chunks = []
+    for _ in range(edits):
+        # Набор одного символа в случайном месте; между нажатиями окно успевает дозобрать текст
+        type_char(document, dirty, rng.randrange(document.length), "ж")
+        timings.append(render_ms(preview, document, dirty))
+        chunks.extend(idle_ms(preview, document))
+    timings.sort()
+    within = sum(t <= FRAME_MS for t in timings)
+    p99 = timings[int(len(timings) * 0.99)]
+    print(f"Правки по символу ({edits}): медиана {timings[len(timings) // 2]:.2f} мс, "
+          f"p99 {p99:.2f} мс, макс. {timings[-1]:.2f} мс, "
+          f"в пределах кадра ({FRAME_MS:g} мс): {within / len(timings):.0%}")
+    if chunks:
+        print(f"Порции дозбора при простое ({len(chunks)}): макс. {max(chunks):.1f} мс")
+
+    # Худший случай: открывающая ``` в начале меняет разбор всего документа
+    document.insert(0, "```\n")
+    dirty.mark(0, 1, 2)
+    toggles = [render_ms(preview, document, dirty)]
+    print(f"Вставка ``` в начало: {toggles[-1]:.1f} мс; {report_idle(idle_ms(preview, document))}")
+    document.delete(0, 4)
+    dirty.mark(0, 2, 1)
+    toggles.append(render_ms(preview, document, dirty))
+    print(f"Удаление ``` из начала: {toggles[-1]:.1f} мс; {report_idle(idle_ms(preview, document))}")
+
+    ok = p99 <= FRAME_MS and max(toggles) <= FRAME_MS
+    print(f"Цель {FRAME_MS:g} мс (p99 правок и переключение ```): {'выполнена' if ok else 'НЕ ВЫПОЛНЕНА'}")
+    return ok
+
+
+def bench_search(lines: int, queries: int):
+    document = PieceTable(make_note(lines))
+    index = WordIndex()
+    start = time.perf_counter()
+    index.replace(WordIndex.build(document.snapshot()), 0)
+    print(f"Заметка: {lines:,} строк; построение индекса: {time.perf_counter() - start:.2f} с "
+          f"({len(index.postings):,} слов)")
+
+    rng = Random(3)
+    words = list(index.postings)
+    for edits in (0, 100):
+        dirty = DirtyLines()
+        for _ in range(edits):
+            offset = rng.randrange(document.length)
+            line = document.text(0, offset).count("\n")
+            type_char(document, dirty, offset, " слово ")
+            index.mark(line, line + 1, line + 1)
+        start = time.perf_counter()
+        for _ in range(queries):
+            index.find(rng.choice(words), document)
+        elapsed = (time.perf_counter() - start) * 1000 / queries
+        print(f"Поиск слова, правок после построения {edits}: {elapsed:.2f} мс на запрос")
+
+
+def bench_switch(notes: int, lines: int, switches: int):
+    """Переключение заметок без Tk: чтение с диска, загрузка документа и
+    предпросмотр — из кэша или полным разбором"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = NoteStore(tmp)
+        text = make_note(lines)
+        start = time.perf_counter()
+        for k in range(notes):
+            store.write(f"note_{k:05}", PieceTable(text))
+        print(f"{notes:,} заметок по {lines:,} строк записано за {time.perf_counter() - start:.1f} с")
+
+        start = time.perf_counter()
+        names = NoteStore(tmp).names()
+        print(f"Список заметок: {(time.perf_counter() - start) * 1000:.1f} мс")
+
+        rng = Random(4)
+        recent = names[:20]   # в основном переключаются между недавними заметками
+        lru = PreviewLRU(32 * 2**20)
+        preview = IncrementalPreview()
+        document = PieceTable()
+        timings = {"из кэша": [], "с разбором": []}
+        for _ in range(switches):
+            name = rng.choice(recent) if rng.random() < 0.8 else rng.choice(names)
+            start = time.perf_counter()
+            text = store.read(name)
+            document.load(text)
+            version = note_version(len(text), 0)
+            cached = lru.get((name, True), version)
+            if cached is not None:
+                preview.kinds = bytearray(cached.kinds)
+                preview.entry = bytearray(cached.entry)
+                preview.parsed = cached.parsed
+                _insert_args(cached.rendered)
+            else:
+                end = min(WINDOW_LINES, document.line_count)
+                preview.reset(document.line_count)
+                preview.parse_more(end, document.line_count, document.lines)
+                rendered = preview.render(0, end, document.lines)
+                _insert_args(rendered)
+                lru.put((name, True), CachedPreview(version, bytes(preview.kinds), bytes(preview.entry),
+                                            preview.parsed, (0, len(rendered)), rendered))
+            timings["из кэша" if cached is not None else "с разбором"].append(
+                (time.perf_counter() - start) * 1000)
+        for kind, values in timings.items():
+            if values:
+                values.sort()
+                print(f"Переключение {kind} ({len(values)}): медиана {values[len(values) // 2]:.2f} мс, "
+                      f"макс. {values[-1]:.2f} мс")
+        print(f"Кэш предпросмотров: {len(lru.items)} заметок, {lru.used / 2**20:.1f} МБ")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки предпросмотра заметок")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    preview = commands.add_parser("preview", help="задержка инкрементального предпросмотра Markdown")
+    preview.add_argument("--lines", type=int, default=50000)
+    preview.add_argument("--edits", type=int, default=500)
+
+    search = commands.add_parser("search", help="индекс слов: построение и поиск")
+    search.add_argument("--lines", type=int, default=500000)
+    search.add_argument("--queries", type=int, default=200)
+
+    switch = commands.add_parser("switch", help="переключение заметок в большой рабочей области")
+    switch.add_argument("--notes", type=int, default=5000)
+    switch.add_argument("--lines", type=int, default=2000)
+    switch.add_argument("--switches", type=int, default=200)
+
+    args = parser.parse_args()
+    if args.command == "preview":
+        if not bench_preview(args.lines, args.edits):
+            sys.exit(1)
+    elif args.command == "search":
+        bench_search(args.lines, args.queries)
+    elif args.command == "switch":
+        bench_switch(args.notes, args.lines, args.switches)
+
+
+if __name__ == "__main__":
+    main()
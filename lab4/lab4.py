@@ -1,15 +1,767 @@
+import argparse
+import os
+import queue
+import re
+import sys
+import time
 import tkinter as tk
 from tkinter import ttk
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
 
+PLACEHOLDER = "Начните вводить текст..."
 
-class NoteEditor:
+
+# Виды строк в разборе Markdown; заголовок уровня k — HEADING + k
+BLANK, PARAGRAPH, LIST_ITEM, FENCE, CODE, HEADING = range(6)
+
+HEADING_RE = re.compile(r"(#{1,6}) ")
+LIST_RE = re.compile(r"(\s*)([-*+]|\d+[.)]) ")
+INLINE_RE = re.compile(r"`([^`]+)`|\*\*(.+?)\*\*|__(.+?)__|\*([^*\s][^*]*)\*|(?<!\w)_([^_]+)_(?!\w)")
+INLINE_TAGS = (None, "code", "bold", "bold", "italic", "italic")
+INLINE_MARKS = frozenset("`*_")
+
+# Отрисованная строка: текст и отрезки тегов (тег, начало, конец) в символах строки
+RenderedLine = Tuple[str, Tuple[Tuple[str, int, int], ...]]
+
+
+@dataclass
+class Block:
+    """Блок разбора: строки [start, end) одного вида"""
+    kind: str
+    start: int
+    end: int
+    level: int = 0
+
+
+def classify_line(line: str, in_code: bool) -> Tuple[int, bool]:
+    """Вид строки и состояние после неё (внутри блока кода или нет)"""
+    stripped = line.lstrip()
+    if stripped.startswith("```"):
+        return FENCE, not in_code
+    if in_code:
+        return CODE, True
+    if not stripped:
+        return BLANK, False
+    if stripped[0] == "#":
+        m = HEADING_RE.match(stripped)
+        if m:
+            return HEADING + len(m.group(1)), False
+    if LIST_RE.match(line):
+        return LIST_ITEM, False
+    return PARAGRAPH, False
+
+
+def render_inline(text: str, offset: int, spans: list) -> str:
+    """Выделение внутри строки: **жирный**, *курсив*, `код` — маркеры убираются,
+    отрезки тегов добавляются в spans со сдвигом offset"""
+    if INLINE_MARKS.isdisjoint(text):
+        return text
+    out = []
+    pos = 0
+    col = offset
+    for m in INLINE_RE.finditer(text):
+        out.append(text[pos:m.start()])
+        col += m.start() - pos
+        inner = m.group(m.lastindex)
+        spans.append((INLINE_TAGS[m.lastindex], col, col + len(inner)))
+        out.append(inner)
+        col += len(inner)
+        pos = m.end()
+    out.append(text[pos:])
+    return "".join(out)
+
+
+def render_line(line: str, kind: int, bold_titles: bool = True) -> RenderedLine:
+    """Строка предпросмотра с тегами. Маркеры разметки убираются; строки ```
+    остаются пустыми, чтобы строки предпросмотра совпадали со строками заметки"""
+    spans = []
+    if kind == BLANK or kind == FENCE:
+        return "", ()
+    if kind == CODE:
+        return line, (("code_block", 0, len(line)),)
+    if kind > HEADING:
+        if not bold_titles:
+            return line, ()
+        level = kind - HEADING
+        text = render_inline(line.strip()[level + 1:].strip(), 0, spans)
+        spans.insert(0, (f"h{min(level, 3)}", 0, len(text)))
+        return text, tuple(spans)
+    if kind == LIST_ITEM:
+        m = LIST_RE.match(line)
+        marker = m.group(2)
+        prefix = m.group(1) + ("•" if marker in "-*+" else marker) + " "
+        return prefix + render_inline(line[m.end():], len(prefix), spans), tuple(spans)
+    return render_inline(line, 0, spans), tuple(spans)
+
+
+# Заплатка текстового виджета: его строки [start, end) заменяются на lines
+Patch = Tuple[int, int, List[RenderedLine]]
+
+
+class IncrementalPreview:
+    """Разбор Markdown с кэшем по строкам и отрисовка по запросу (без Tk).
+
+    Для каждой строки хранится её вид и состояние на входе (внутри блока
+    кода или нет). Разбор ленивый: строки [0, parsed) разобраны, дальше
+    границы разбора данные устарели и дозбираются parse_more (окно — при
+    отрисовке, остальное — при простое). reparse разбирает заново только
+    изменённые строки; если после правки изменилось состояние (открыли или
+    закрыли ```), разбор продолжается, пока состояние не совпадёт с прежним,
+    но не дальше limit — там он останавливается и граница разбора сдвигается
+    назад. Отрисовка (render) — только для нужных, уже разобранных строк.
+    """
+    # Сколько строк за раз запрашивать у документа, когда разбор идёт дальше правки
+    FETCH_LINES = 256
+
+    def __init__(self, bold_titles: bool = True):
+        self.bold_titles = bold_titles
+        self.reset()
+
+    def reset(self, line_count: int = 0):
+        """Забыть прошлый разбор: текст из line_count строк не разобран"""
+        self.kinds = bytearray(line_count)
+        self.entry = bytearray(line_count + 1)   # состояние на входе в каждую строку и после последней
+        self.parsed = 0
+
+    @property
+    def line_count(self) -> int:
+        return len(self.kinds)
+
+    def reparse(self, start: int, old_end: int, new_end: int, line_count: int,
+                get_lines: Callable[[int, int], List[str]],
+                limit: Optional[int] = None) -> Tuple[int, int, int]:
+        """Строки [start, old_end) прошлого разбора стали строками [start, new_end)
+        текста из line_count строк; get_lines(a, b) — строки [a, b) текста.
+        Изменённые строки разбираются всегда, строки за ними — не дальше limit
+        (по умолчанию до конца текста).
+
+        Возвращает фактически переразобранный диапазон в том же виде
+        (start, old_end, new_end) — он шире правки, если сменилось состояние.
+        """
+        if limit is None:
+            limit = line_count
+        parsed = self.parsed
+        if start > parsed:
+            # Правка за границей разбора: строки всё равно будут разобраны заново
+            self.kinds[start:old_end] = bytes(new_end - start)
+            self.entry[start + 1:old_end + 1] = bytes(new_end - start)
+            self.parse_more(limit, line_count, get_lines)
+            return start, old_end, new_end
+
+        kinds = bytearray()
+        entry = bytearray()
+        in_code = bool(self.entry[start])
+        lines = get_lines(start, new_end)
+        first = start   # номер строки lines[0]
+        i = start
+        converged = False
+        while True:
+            if i == new_end:
+                # Правленые строки разобраны; дальше — пока состояние не сойдётся
+                # с прежним (оно известно до границы разбора), но не дальше limit
+                if old_end <= parsed and in_code == bool(self.entry[old_end]):
+                    converged = True
+                    break
+                if new_end == line_count or i >= limit:
+                    break
+                old_end += 1
+                new_end += 1
+            if i - first == len(lines):
+                first = i
+                lines = get_lines(i, min(i + self.FETCH_LINES, line_count))
+            line = lines[i - first]
+            kind, next_state = classify_line(line, in_code)
+            entry.append(in_code)
+            kinds.append(kind)
+            in_code = next_state
+            i += 1
+        entry.append(in_code)
+
+        self.kinds[start:old_end] = kinds
+        self.entry[start:old_end + 1] = entry
+        self.parsed = parsed + new_end - old_end if converged else new_end
+        return start, old_end, new_end
+
+    def parse_more(self, end: int, line_count: int, get_lines: Callable[[int, int], List[str]]) -> int:
+        """Дозбор строк от границы разбора до end; возвращает новую границу"""
+        end = min(end, line_count)
+        i = self.parsed
+        kinds = self.kinds
+        entry = self.entry
+        in_code = bool(entry[i])
+        while i < end:
+            count = min(self.FETCH_LINES, end - i)
+            for line in get_lines(i, i + count):
+                kinds[i], in_code = classify_line(line, in_code)
+                i += 1
+                entry[i] = in_code
+        self.parsed = max(self.parsed, end)
+        return self.parsed
+
+    def render(self, start: int, end: int, get_lines: Callable[[int, int], List[str]]) -> List[RenderedLine]:
+        """Отрисовка разобранных строк [start, end)"""
+        kinds = self.kinds
+        return [render_line(line, kinds[i], self.bold_titles)
+                for i, line in enumerate(get_lines(start, end), start)]
+
+    def render_all(self, lines: List[str]) -> List[RenderedLine]:
+        """Разбор и отрисовка всего текста заново"""
+        self.reset(len(lines))
+        self.parse_more(len(lines), len(lines), lambda a, b: lines[a:b])
+        return self.render(0, len(lines), lambda a, b: lines[a:b])
+
+    def blocks(self) -> List[Block]:
+        """Дерево (список) блоков по кэшу разбора (до границы разбора): соседние
+        строки кода, списка и абзаца объединяются, заголовок — отдельный блок"""
+        names = {PARAGRAPH: "paragraph", LIST_ITEM: "list", FENCE: "code", CODE: "code"}
+        blocks: List[Block] = []
+        for i, kind in enumerate(self.kinds[:self.parsed]):
+            if kind == BLANK:
+                continue
+            if kind > HEADING:
+                blocks.append(Block("heading", i, i + 1, kind - HEADING))
+                continue
+            name = names[kind]
+            # Открывающая ``` начинает новый блок кода, даже если перед ней был другой
+            opens = kind == FENCE and not self.entry[i]
+            last = blocks[-1] if blocks else None
+            if last is not None and last.kind == name and last.end == i and not opens:
+                last.end = i + 1
+            else:
+                blocks.append(Block(name, i, i + 1))
+        return blocks
+
+
+# Кусок документа: (номер буфера, начало, конец, число переводов строки)
+Piece = Tuple[int, int, int, int]
+
+NON_SPACE_RE = re.compile(r"\S")
+WORD_RE = re.compile(r"\w+")
+
+
+class PieceTable:
+    """Текст заметки в виде таблицы кусков (без Tk).
+
+    Документ — последовательность кусков-описателей, ссылающихся на неизменяемые
+    буферы: исходный текст и по буферу на каждую вставку. Правка не копирует
+    текст: вставка добавляет буфер, а кусок, в который она попала, делится на
+    два описателя; удаление только укорачивает или выбрасывает куски. Набор
+    подряд дописывается в последний буфер. Для поиска строк у каждого буфера
+    лениво строится массив позиций переводов строки.
+    """
+    # При большем числе кусков документ склеивается в один буфер
+    MAX_PIECES = 1024
+
+    def __init__(self, text: str = ""):
+        self.load(text)
+
+    def load(self, text: str):
+        self.buffers: List[str] = [text]
+        self.pieces: List[Piece] = [(0, 0, len(text), text.count("\n"))] if text else []
+        self.length = len(text)
+        self.newlines = text.count("\n")
+        self._newline_cache = {}
+
+    @property
+    def line_count(self) -> int:
+        return self.newlines + 1
+
+    def _newline_positions(self, buf: int) -> array:
+        positions = self._newline_cache.get(buf)
+        if positions is None:
+            text = self.buffers[buf]
+            positions = array("q", (m.start() for m in re.finditer("\n", text)))
+            self._newline_cache[buf] = positions
+        return positions
+
+    def _count_newlines(self, buf: int, start: int, end: int) -> int:
+        if end - start < 4096:
+            return self.buffers[buf].count("\n", start, end)
+        positions = self._newline_positions(buf)
+        return bisect_left(positions, end) - bisect_left(positions, start)
+
+    def _find(self, offset: int) -> Tuple[int, int]:
+        """Кусок, в котором находится позиция offset, и сдвиг внутри него"""
+        pos = 0
+        for i, (_, start, end, _) in enumerate(self.pieces):
+            size = end - start
+            if offset < pos + size:
+                return i, offset - pos
+            pos += size
+        return len(self.pieces), 0
+
+    def _split(self, i: int, k: int) -> List[Piece]:
+        """Кусок i, разделённый на два по сдвигу k (пустые части отбрасываются)"""
+        buf, start, end, newlines = self.pieces[i]
+        left = self._count_newlines(buf, start, start + k)
+        parts = []
+        if k > 0:
+            parts.append((buf, start, start + k, left))
+        if start + k < end:
+            parts.append((buf, start + k, end, newlines - left))
+        return parts
+
+    def insert(self, offset: int, text: str):
+        if not text:
+            return
+        offset = min(offset, self.length)
+        newlines = text.count("\n")
+        i, k = self._find(offset)
+        self.length += len(text)
+        self.newlines += newlines
+
+        last = len(self.buffers) - 1
+        if k == 0 and i > 0 and last > 0:
+            buf, start, end, count = self.pieces[i - 1]
+            if buf == last and end == len(self.buffers[last]):
+                # Продолжение набора: дописываем в последний буфер
+                self.buffers[last] += text
+                self._newline_cache.pop(last, None)
+                self.pieces[i - 1] = (buf, start, end + len(text), count + newlines)
+                return
+
+        self.buffers.append(text)
+        piece = (len(self.buffers) - 1, 0, len(text), newlines)
+        if k == 0:
+            self.pieces.insert(i, piece)
+        else:
+            left, right = self._split(i, k)
+            self.pieces[i:i + 1] = [left, piece, right]
+        if len(self.pieces) > self.MAX_PIECES:
+            self.compact()
+
+    def delete(self, start: int, end: int):
+        end = min(end, self.length)
+        if start >= end:
+            return
+        i, k = self._find(start)
+        j, m = self._find(end)
+        replacement = self._split(i, k)[:1] if k else []
+        if j < len(self.pieces) and m:
+            replacement += self._split(j, m)[1:]
+            j += 1
+        removed = sum(p[3] for p in self.pieces[i:j]) - sum(p[3] for p in replacement)
+        self.pieces[i:j] = replacement
+        self.length -= end - start
+        self.newlines -= removed
+
+    def compact(self):
+        """Склеить документ в один буфер (раз в MAX_PIECES правок)"""
+        self.load(self.text())
+
+    def text(self, start: int = 0, end: Optional[int] = None) -> str:
+        end = self.length if end is None else min(end, self.length)
+        parts = []
+        pos = 0
+        for buf, s, e, _ in self.pieces:
+            size = e - s
+            if pos + size > start and pos < end:
+                parts.append(self.buffers[buf][s + max(start - pos, 0):s + min(end - pos, size)])
+            pos += size
+            if pos >= end:
+                break
+        return "".join(parts)
+
+    def line_start(self, line: int) -> int:
+        """Позиция начала строки line (с нуля); за последней строкой — длина текста"""
+        if line <= 0:
+            return 0
+        if line > self.newlines:
+            return self.length
+        pos = 0
+        for buf, s, e, newlines in self.pieces:
+            if line <= newlines:
+                if e - s < 4096:
+                    nl = s - 1
+                    for _ in range(line):
+                        nl = self.buffers[buf].index("\n", nl + 1)
+                else:
+                    positions = self._newline_positions(buf)
+                    nl = positions[bisect_left(positions, s) + line - 1]
+                return pos + nl - s + 1
+            line -= newlines
+            pos += e - s
+        return self.length
+
+    def offset(self, line: int, col: int) -> int:
+        """Позиция символа col строки line (с нуля), как у индекса Tk «line+1.col»"""
+        start = self.line_start(line)
+        end = self.line_start(line + 1) - 1 if line < self.newlines else self.length
+        return min(start + col, end)
+
+    def lines(self, start: int, end: int) -> List[str]:
+        """Строки [start, end)"""
+        if start >= end:
+            return []
+        last = self.line_start(end) - 1 if end <= self.newlines else self.length
+        return self.text(self.line_start(start), last).split("\n")
+
+    def is_blank(self) -> bool:
+        return not any(NON_SPACE_RE.search(self.buffers[buf], s, e) for buf, s, e, _ in self.pieces)
+
+    def snapshot(self) -> "PieceTable":
+        """Неизменяемая копия для чтения в другом потоке: копируются только описатели"""
+        copy = PieceTable.__new__(PieceTable)
+        copy.buffers = list(self.buffers)
+        copy.pieces = list(self.pieces)
+        copy.length = self.length
+        copy.newlines = self.newlines
+        copy._newline_cache = {}
+        return copy
+
+
+class DirtyLines:
+    """Строки, изменившиеся с прошлой отрисовки: диапазон [start, end) в текущих
+    номерах строк и на сколько с тех пор изменилось число строк"""
     def __init__(self):
+        self.range: Optional[Tuple[int, int]] = None
+        self.shift = 0
+
+    def mark(self, start: int, old_end: int, new_end: int):
+        """Строки [start, old_end) заменены строками [start, new_end)"""
+        delta = new_end - old_end
+        if self.range is None:
+            self.range = (start, new_end)
+        else:
+            s, e = self.range
+            e = e + delta if e >= old_end else new_end
+            self.range = (min(s, start), max(e, new_end))
+        self.shift += delta
+
+    def take(self) -> Optional[Tuple[int, int, int]]:
+        """(start, old_end, new_end) для IncrementalPreview.reparse; сбрасывает диапазон"""
+        if self.range is None:
+            return None
+        start, end = self.range
+        result = (start, end - self.shift, end)
+        self.range = None
+        self.shift = 0
+        return result
+
+
+class WordIndex:
+    """Обратный индекс слов заметки: слово в нижнем регистре → номера строк.
+
+    Индекс строится целиком по снимку документа (build — в фоновом потоке),
+    а правки после снимка копятся в edits: при поиске номера строк из индекса
+    сдвигаются по правкам, а изменённые строки просматриваются напрямую.
+    """
+    def __init__(self):
+        self.postings: Dict[str, array] = {}
+        self.edits: List[Tuple[int, int, int]] = []
+
+    @staticmethod
+    def build(document: PieceTable) -> Dict[str, array]:
+        postings: Dict[str, array] = {}
+        for no, line in enumerate(document.text().lower().split("\n")):
+            for word in set(WORD_RE.findall(line)):
+                lines = postings.get(word)
+                if lines is None:
+                    postings[word] = lines = array("I")
+                lines.append(no)
+        return postings
+
+    def mark(self, start: int, old_end: int, new_end: int):
+        self.edits.append((start, old_end, new_end))
+
+    def replace(self, postings: Dict[str, array], edits_seen: int):
+        """Новый индекс по снимку, сделанному после edits_seen правок"""
+        self.postings = postings
+        del self.edits[:edits_seen]
+
+    def _dirty_ranges(self) -> List[Tuple[int, int]]:
+        """Диапазоны строк, изменённых после снимка, в текущих номерах"""
+        ranges: List[Tuple[int, int]] = []
+        for start, old_end, new_end in self.edits:
+            delta = new_end - old_end
+            lo, hi = start, new_end
+            moved = []
+            for s, e in ranges:
+                if e <= start:
+                    moved.append((s, e))
+                elif s >= old_end:
+                    moved.append((s + delta, e + delta))
+                else:
+                    # Пересекается с правкой — сливается с её диапазоном
+                    lo = min(lo, s)
+                    hi = max(hi, e + delta if e > old_end else new_end)
+            moved.append((lo, hi))
+            ranges = sorted(moved)
+        return ranges
+
+    def find(self, query: str, document: PieceTable) -> List[int]:
+        """Номера строк (с нуля), где есть все слова запроса"""
+        words = set(WORD_RE.findall(query.lower()))
+        if not words:
+            return []
+        postings = sorted((self.postings.get(w, ()) for w in words), key=len)
+        found = set(postings[0]).intersection(*postings[1:])
+        for start, old_end, new_end in self.edits:
+            delta = new_end - old_end
+            found = {n if n < start else n + delta for n in found if n < start or n >= old_end}
+        for start, end in self._dirty_ranges():
+            found.difference_update(range(start, end))
+            for no, line in enumerate(document.lines(start, end), start):
+                if words.issubset(WORD_RE.findall(line.lower())):
+                    found.add(no)
+        return sorted(found)
+
+
+def watch_text_edits(widget: tk.Text, on_insert: Callable[[str, str], None],
+                     on_delete: Callable[[str, str], None]):
+    """Перехват правок текстового виджета: команда виджета в Tcl подменяется
+    обёрткой, которая после insert/delete/replace сообщает позиции правки
+    в виде «строка.символ» (вычисленные до правки) и вставленный текст"""
+    orig = widget._w + "_orig"
+    widget.tk.call("rename", widget._w, orig)
+
+    def index(i) -> str:
+        return str(widget.tk.call(orig, "index", i))
+
+    def proxy(*args):
+        cmd = args[0] if args else ""
+        if cmd == "insert":
+            pos = index(args[1])
+            if widget.tk.call(orig, "compare", pos, ">", "end-1c"):
+                pos = index("end-1c")  # Tk вставляет перед последним переводом строки
+            result = widget.tk.call((orig,) + args)
+            on_insert(pos, "".join(args[2::2]))
+            return result
+        if cmd in ("delete", "replace"):
+            first = index(args[1])
+            last = index(args[2]) if len(args) > 2 else index(f"{first}+1c")
+            result = widget.tk.call((orig,) + args)
+            on_delete(first, last)
+            if cmd == "replace":
+                on_insert(first, "".join(args[3::2]))
+            return result
+        return widget.tk.call((orig,) + args)
+
+    widget.tk.createcommand(widget._w, proxy)
+
+
+# Рабочая область по умолчанию — рядом с программой, а не в текущем каталоге
+DEFAULT_WORKSPACE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "notes")
+
+
+class NoteStore:
+    """Рабочая область: каталог с заметками, по файлу <имя>.md на заметку.
+
+    Список имён читается с диска один раз и дальше ведётся в памяти,
+    поэтому открытие заметки не зависит от их числа. write безопасна для
+    вызова из фонового потока: запись через временный файл и os.replace.
+    """
+    SUFFIX = ".md"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._names: Optional[List[str]] = None
+
+    @staticmethod
+    def valid_name(name: str) -> bool:
+        return bool(name) and name == name.strip() and not any(c in name for c in '/\\:') \
+            and name not in (".", "..")
+
+    def names(self) -> List[str]:
+        if self._names is None:
+            with os.scandir(self.directory) as entries:
+                self._names = sorted(e.name[:-len(self.SUFFIX)] for e in entries
+                                     if e.is_file() and e.name.endswith(self.SUFFIX))
+        return self._names
+
+    def add(self, name: str):
+        """Новое имя в списке (сам файл появится при первом сохранении)"""
+        names = self.names()
+        i = bisect_left(names, name)
+        if i == len(names) or names[i] != name:
+            names.insert(i, name)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name + self.SUFFIX)
+
+    def read(self, name: str) -> str:
+        try:
+            with open(self.path(name), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return ""
+
+    def write(self, name: str, document: PieceTable):
+        """Сохранение снимка документа (вызывается в фоновом потоке)"""
+        filename = self.path(name)
+        tmp_name = filename + ".tmp"
+        try:
+            with open(tmp_name, "w", encoding="utf-8", newline="") as f:
+                f.write(document.text())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_name, filename)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+            raise
+
+
+def note_version(length: int, edits: int) -> Tuple[int, int]:
+    """Отпечаток заметки без обхода текста: длина и число правок в редакторе.
+    Кэш предпросмотра годится, только если отпечаток совпал"""
+    return length, edits
+
+
+# Ключ кэша предпросмотров: (имя заметки, жирные заголовки)
+PreviewKey = Tuple[str, bool]
+
+
+@dataclass
+class CachedPreview:
+    """Разбор и отрисованное окно предпросмотра заметки"""
+    version: Tuple[int, int]
+    kinds: bytes
+    entry: bytes
+    parsed: int
+    window: Tuple[int, int]
+    rendered: List[RenderedLine]
+    size: int = 0
+
+
+class PreviewLRU:
+    """Кэш предпросмотров недавно открытых заметок с бюджетом по памяти.
+
+    Размер записи оценивается по массивам разбора и строкам окна; при
+    превышении бюджета вытесняются давно не открывавшиеся заметки. Ключ —
+    заметка вместе с настройками отрисовки (PreviewKey).
+    """
+    def __init__(self, budget_bytes: int):
+        self.budget = budget_bytes
+        self.used = 0
+        self.items: "OrderedDict[PreviewKey, CachedPreview]" = OrderedDict()
+
+    @staticmethod
+    def estimate(item: CachedPreview) -> int:
+        return (sys.getsizeof(item.kinds) + sys.getsizeof(item.entry) + 64 * len(item.rendered)
+                + sum(sys.getsizeof(text) + 48 * len(spans) for text, spans in item.rendered))
+
+    def get(self, key: PreviewKey, version: Tuple[int, int]) -> Optional[CachedPreview]:
+        item = self.items.get(key)
+        if item is None:
+            return None
+        if item.version != version:
+            self.pop(key)
+            return None
+        self.items.move_to_end(key)
+        return item
+
+    def pop(self, key: PreviewKey):
+        item = self.items.pop(key, None)
+        if item is not None:
+            self.used -= item.size
+
+    def put(self, key: PreviewKey, item: CachedPreview):
+        self.pop(key)
+        item.size = self.estimate(item)
+        if item.size > self.budget:
+            return
+        self.items[key] = item
+        self.used += item.size
+        while self.used > self.budget:
+            _, old = self.items.popitem(last=False)
+            self.used -= old.size
+
+
+def _insert_args(lines: List[RenderedLine], lead: str = "", sep: str = "\n", trail: str = "") -> list:
+    """Аргументы Text.insert: чередование (текст, теги) для строк с отрезками тегов"""
+    args = [lead, ()] if lead else []
+    for no, (text, spans) in enumerate(lines):
+        if no:
+            args += [sep, ()]
+        if not spans:
+            args += [text, ()]
+            continue
+        cuts = sorted({0, len(text), *(p for _, a, b in spans for p in (a, b))})
+        for a, b in zip(cuts, cuts[1:]):
+            tags = tuple(tag for tag, s, e in spans if s <= a and b <= e)
+            args += [text[a:b], tags]
+    if trail:
+        args += [trail, ()]
+    return args
+
+
+def patch_text_lines(widget: tk.Text, patch: Patch, old_count: int):
+    """Замена строк [start, end) в текстовом виджете, где было old_count строк"""
+    start, end, lines = patch
+    if end < old_count:
+        widget.delete(f"{start + 1}.0", f"{end + 1}.0")
+        if lines:
+            widget.insert(f"{start + 1}.0", *_insert_args(lines, trail="\n"))
+    elif start > 0:
+        # Хвост документа: вместе со строками убираем перевод строки перед ними
+        widget.delete(f"{start}.end", "end-1c")
+        if lines:
+            widget.insert("end-1c", *_insert_args(lines, lead="\n"))
+    else:
+        widget.delete("1.0", "end-1c")
+        if lines:
+            widget.insert("1.0", *_insert_args(lines))
+
+
+class NoteEditor:
+    # Предпросмотр обновляется после паузы в наборе, но при непрерывном
+    # наборе — не реже, чем раз в PREVIEW_MAX_DELAY_MS
+    PREVIEW_DEBOUNCE_MS = 120
+    PREVIEW_MAX_DELAY_MS = 400
+    # В предпросмотре отрисованы только видимые строки и столько же строк запаса
+    # сверху и снизу; прокрутка догружает недостающие
+    PREVIEW_MARGIN = 30
+    # Разбор за окном предпросмотра идёт при простое, порциями по столько строк
+    PREVIEW_IDLE_LINES = 2000
+    # Индекс слов перестраивается в фоне после паузы в правках
+    INDEX_DELAY_MS = 1000
+    POLL_MS = 50
+    MAX_HIGHLIGHTS = 2000
+    # Заметка сохраняется в фоне после паузы в правках
+    SAVE_DELAY_MS = 1000
+    PREVIEW_CACHE_BYTES = 32 * 2**20
+
+    def __init__(self, workspace: str = DEFAULT_WORKSPACE):
         self.root = tk.Tk()
         self.root.title("Заметки с предпросмотром")
-        self.root.geometry("600x550")
+        self.root.geometry("600x650")
         self.root.configure(bg="#f8f9fa")
 
-        self.current_text = ""
+        self.store = NoteStore(workspace)
+        self.note_name: Optional[str] = None
+        self.loading = False   # текст заметки загружается в поле — правки не отслеживаются
+        self.edit_counts: Dict[str, int] = {}   # правок по заметкам — отпечаток для кэша предпросмотра
+        self.preview_lru = PreviewLRU(self.PREVIEW_CACHE_BYTES)
+        self.saver = ThreadPoolExecutor(max_workers=1)
+        self.save_results: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self.save_job = None
+        self.saves_pending = 0
+        self.unsaved = False
+
+        self.document = PieceTable()
+        self.dirty_lines = DirtyLines()
+        self.preview_cache = IncrementalPreview()
+        self.placeholder_shown = False
+        self.preview_window: Optional[Tuple[int, int]] = None  # строки заметки в предпросмотре
+        self.preview_job = None
+        self.scroll_job = None
+        self.parse_job = None
+        self.preview_dirty_since = 0.0
+
+        self.word_index = WordIndex()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.index_results: "queue.Queue[Tuple[int, int, Future]]" = queue.Queue()
+        self.index_generation = 0   # растёт при смене заметки: индексы прежней отбрасываются
+        self.index_job = None
+        self.index_running = False
+        self.index_stale = False
 
         self.themes = {
             "Светлая": {"bg": "#ffffff", "fg": "#212529", "insert": "#0d6efd"},
@@ -19,18 +771,50 @@ class NoteEditor:
         }
 
         self.create_ui()
+        names = self.store.names()
+        self.open_note(names[0] if names else "Заметка")
         self.root.mainloop()
 
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.unsaved:
+            self.saver.submit(self.store.write, self.note_name, self.document.snapshot())
+        self.saver.shutdown(wait=True)
+
     def create_ui(self):
         main_frame = ttk.Frame(self.root, padding=15)
         main_frame.pack(fill="both", expand=True)
 
         ttk.Label(main_frame, text="Мои быстрые заметки", font=("Helvetica", 14, "bold")).pack(pady=(0, 10))
 
+        note_frame = ttk.Frame(main_frame)
+        note_frame.pack(fill="x", pady=(0, 10))
+        ttk.Label(note_frame, text="Заметка:").pack(side="left")
+        self.note_var = tk.StringVar()
+        self.note_combo = ttk.Combobox(note_frame, textvariable=self.note_var, values=self.store.names(), width=30)
+        self.note_combo.pack(side="left", padx=5)
+        self.note_combo.bind("<<ComboboxSelected>>", self.open_note_from_ui)
+        self.note_combo.bind("<Return>", self.open_note_from_ui)
+        ttk.Button(note_frame, text="Открыть / создать", command=self.open_note_from_ui).pack(side="left")
+        self.status_label = ttk.Label(note_frame, text="", foreground="gray")
+        self.status_label.pack(side="left", padx=10)
+
         ttk.Label(main_frame, text="Введите текст заметки:").pack(anchor="w")
         self.text_input = tk.Text(main_frame, height=8, width=60, wrap="word", font=("Arial", 11))
         self.text_input.pack(pady=5, fill="x")
-        self.text_input.bind("<KeyRelease>", self.update_preview)
+        self.text_input.tag_configure("found", background="#ffe066")
+        watch_text_edits(self.text_input, self.on_text_insert, self.on_text_delete)
+        self.text_input.config(yscrollcommand=self.on_source_scroll)
+
+        find_frame = ttk.Frame(main_frame)
+        find_frame.pack(fill="x")
+        ttk.Label(find_frame, text="Найти:").pack(side="left")
+        self.find_var = tk.StringVar()
+        find_entry = ttk.Entry(find_frame, textvariable=self.find_var, width=30)
+        find_entry.pack(side="left", padx=5)
+        find_entry.bind("<Return>", self.find_in_note)
+        ttk.Button(find_frame, text="Найти", command=self.find_in_note).pack(side="left")
+        self.find_label = ttk.Label(find_frame, text="")
+        self.find_label.pack(side="left", padx=10)
 
         ttk.Label(main_frame, text="Тема предпросмотра:").pack(anchor="w", pady=(15, 0))
         self.theme_var = tk.StringVar(value="Светлая")
@@ -49,52 +833,354 @@ class NoteEditor:
             main_frame,
             text="Выделять заголовки жирным (строки с #)",
             variable=self.bold_titles_var,
-            command=self.update_preview  
+            command=self.rerender_preview
         ).pack(anchor="w", pady=10)
 
         ttk.Label(main_frame, text="Предпросмотр заметки:", font=("Helvetica", 11, "bold")).pack(anchor="w", pady=(15, 5))
         self.preview_text = tk.Text(main_frame, height=10, width=60, wrap="word", font=("Arial", 11), state="disabled")
         self.preview_text.pack(fill="x", pady=5)
+        # Теги разметки Markdown в предпросмотре
+        self.preview_text.tag_configure("h1", font=("Arial", 16, "bold"))
+        self.preview_text.tag_configure("h2", font=("Arial", 14, "bold"))
+        self.preview_text.tag_configure("h3", font=("Arial", 12, "bold"))
+        self.preview_text.tag_configure("bold", font=("Arial", 11, "bold"))
+        self.preview_text.tag_configure("italic", font=("Arial", 11, "italic"))
+        self.preview_text.tag_configure("code", font=("Consolas", 10))
+        self.preview_text.tag_configure("code_block", font=("Consolas", 10), lmargin1=12, lmargin2=12)
+        # Предпросмотр прокручивается вместе с заметкой
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.preview_text.bind(sequence, self.on_preview_wheel)
 
         clear_frame = ttk.Frame(main_frame)
         clear_frame.pack(pady=15, fill="x")
         ttk.Button(clear_frame, text="Очистить всё", command=self.clear_all, width=20).pack()
 
         self.apply_theme()  # начальная тема
+        self.update_preview()
+
+    def open_note_from_ui(self, event=None):
+        name = self.note_var.get().strip()
+        if not NoteStore.valid_name(name):
+            self.status_label.config(text="Недопустимое имя заметки")
+            return
+        self.open_note(name)
+
+    def open_note(self, name: str):
+        """Переключение на заметку: текущая сохраняется в фоне, её предпросмотр
+        остаётся в кэше; новая читается с диска, предпросмотр берётся из кэша,
+        если заметка с тех пор не менялась"""
+        start = time.perf_counter()
+        if name == self.note_name:
+            return
+        if self.note_name is not None:
+            self.save_note()
+            self.remember_preview()
+        if name not in self.store.names():
+            self.store.add(name)
+            self.note_combo.config(values=self.store.names())
+        self.note_var.set(name)
+        self.note_name = name
+        text = self.store.read(name)
+
+        self.loading = True
+        try:
+            self.text_input.delete("1.0", tk.END)
+            self.text_input.insert("1.0", text)
+        finally:
+            self.loading = False
+        self.text_input.mark_set("insert", "1.0")
+        self.document.load(text)
+        self.dirty_lines.take()
+        self.word_index = WordIndex()
+        self.index_generation += 1
+        self.schedule_index()
+        self.find_label.config(text="")
+
+        cached = self.preview_lru.get(self.preview_key(),
+                                      note_version(len(text), self.edit_counts.get(name, 0)))
+        self.preview_window = None
+        if cached is None:
+            self.placeholder_shown = True  # update_preview разберёт заметку целиком
+            self.update_preview()
+        else:
+            self.preview_cache.kinds = bytearray(cached.kinds)
+            self.preview_cache.entry = bytearray(cached.entry)
+            self.preview_cache.parsed = cached.parsed
+            self.preview_text.config(state="normal")
+            self.preview_text.delete("1.0", tk.END)
+            patch_text_lines(self.preview_text, (0, 0, cached.rendered), 0)
+            self.preview_window = cached.window
+            self.placeholder_shown = False
+            self.show_preview_window()
+            self.preview_text.config(state="disabled")
+        self.status_label.config(text=f"открыта за {(time.perf_counter() - start) * 1000:.0f} мс")
+
+    def remember_preview(self):
+        """Предпросмотр текущей заметки — в кэш перед переключением"""
+        if self.dirty_lines.range is not None:
+            self.update_preview()  # сначала учесть последние правки
+        if self.placeholder_shown or self.preview_window is None:
+            return
+        first, last = self.preview_window
+        self.preview_lru.put(self.preview_key(), CachedPreview(
+            note_version(self.document.length, self.edit_counts.get(self.note_name, 0)),
+            bytes(self.preview_cache.kinds),
+            bytes(self.preview_cache.entry), self.preview_cache.parsed, self.preview_window,
+            self.preview_cache.render(first, last, self.document.lines)))
+
+    def preview_key(self) -> PreviewKey:
+        return self.note_name, self.bold_titles_var.get()
+
+    def schedule_save(self):
+        if self.save_job is not None:
+            self.root.after_cancel(self.save_job)
+        self.save_job = self.root.after(self.SAVE_DELAY_MS, self.save_note)
+
+    def save_note(self):
+        """Сохранение снимка заметки в фоновом потоке: набор не ждёт диска"""
+        if self.save_job is not None:
+            self.root.after_cancel(self.save_job)
+            self.save_job = None
+        if not self.unsaved:
+            return
+        self.unsaved = False
+        name = self.note_name
+        future = self.saver.submit(self.store.write, name, self.document.snapshot())
+        future.add_done_callback(lambda f: self.save_results.put((name, f)))
+        self.saves_pending += 1
+        if self.saves_pending == 1:
+            self.root.after(self.POLL_MS, self.poll_saves)
+
+    def poll_saves(self):
+        """Итоги фоновых сохранений (в потоке Tk)"""
+        while not self.save_results.empty():
+            name, future = self.save_results.get_nowait()
+            self.saves_pending -= 1
+            error = future.exception()
+            if error is not None:
+                self.status_label.config(text=f"Ошибка сохранения «{name}»: {error}")
+                if name == self.note_name:
+                    self.unsaved = True
+                    self.schedule_save()
+            else:
+                self.status_label.config(text=f"Сохранено: {name}")
+        if self.saves_pending:
+            self.root.after(self.POLL_MS, self.poll_saves)
+
+    def on_text_insert(self, index: str, text: str):
+        if self.loading:
+            return
+        line, col = map(int, index.split("."))
+        self.document.insert(self.document.offset(line - 1, col), text)
+        self.on_lines_changed(line - 1, line, line + text.count("\n"))
+
+    def on_text_delete(self, first: str, last: str):
+        if self.loading:
+            return
+        line, col = map(int, first.split("."))
+        last_line, last_col = map(int, last.split("."))
+        start = self.document.offset(line - 1, col)
+        end = self.document.offset(last_line - 1, last_col)
+        if start >= end:
+            return
+        removed = self.document.text(start, end).count("\n")
+        self.document.delete(start, end)
+        self.on_lines_changed(line - 1, line + removed, line)
+
+    def on_lines_changed(self, start: int, old_end: int, new_end: int):
+        """Строки [start, old_end) заметки заменены строками [start, new_end)"""
+        self.dirty_lines.mark(start, old_end, new_end)
+        self.word_index.mark(start, old_end, new_end)
+        self.edit_counts[self.note_name] = self.edit_counts.get(self.note_name, 0) + 1
+        self.unsaved = True
+        self.schedule_preview()
+        self.schedule_index()
+        self.schedule_save()
+
+    def schedule_preview(self, event=None):
+        """Отложенное обновление предпросмотра: нажатия клавиш подряд сливаются в одно"""
+        now = time.perf_counter()
+        if self.preview_job is None:
+            self.preview_dirty_since = now
+        elif (now - self.preview_dirty_since) * 1000 < self.PREVIEW_MAX_DELAY_MS:
+            self.root.after_cancel(self.preview_job)
+        else:
+            return  # уже ждём дольше предела — не откладываем дальше
+        self.preview_job = self.root.after(self.PREVIEW_DEBOUNCE_MS, self.update_preview)
 
     def update_preview(self, event=None):
-        self.current_text = self.text_input.get("1.0", tk.END).strip()
-
-        preview = self.current_text
-
-        # Применяем форматирование заголовков только если чекбокс включён
-        if self.bold_titles_var.get():
-            lines = preview.split("\n")
-            formatted_lines = []
-            for line in lines:
-                stripped = line.strip()
-                if stripped.startswith("# "):
-                    # Берём текст после # и делаем жирным
-                    formatted_lines.append(f"**{stripped[2:].strip()}**")
-                else:
-                    formatted_lines.append(line)
-            preview = "\n".join(formatted_lines)
+        if self.preview_job is not None:
+            self.root.after_cancel(self.preview_job)
+            self.preview_job = None
 
+        dirty = self.dirty_lines.take()
         self.preview_text.config(state="normal")
-        self.preview_text.delete("1.0", tk.END)
-        self.preview_text.insert("1.0", preview or "Начните вводить текст...")
+        if self.document.is_blank():
+            self.preview_text.delete("1.0", tk.END)
+            self.preview_text.insert("1.0", PLACEHOLDER)
+            self.placeholder_shown = True
+            self.preview_window = None
+        else:
+            lines = self.document.line_count
+            if self.placeholder_shown:
+                self.preview_cache.reset(lines)   # окно разберёт show_preview_window
+                self.placeholder_shown = False
+            elif dirty is not None:
+                # Разбор не дальше нового окна; остальное дозберётся при простое
+                _, _, limit = self.preview_bounds()
+                start, old_end, new_end = self.preview_cache.reparse(*dirty, lines, self.document.lines, limit)
+                if self.preview_window is not None:
+                    first, last = self.preview_window
+                    if old_end <= first:
+                        # Правка выше отрисованных строк — они только сдвигаются
+                        shift = new_end - old_end
+                        self.preview_window = (first + shift, last + shift)
+                    elif start < last:
+                        self.preview_window = None
+            self.show_preview_window()
+        self.preview_text.config(state="disabled")
+
+    def source_top(self) -> int:
+        """Номер (с нуля) первой видимой строки заметки"""
+        return int(self.text_input.index("@0,0").split(".")[0]) - 1
+
+    def preview_bounds(self) -> Tuple[int, int, int]:
+        """Первая видимая строка и окно строк [first, last) для предпросмотра"""
+        lines = self.document.line_count
+        top = min(self.source_top(), lines - 1)
+        height = int(self.preview_text.cget("height"))
+        return top, max(0, top - self.PREVIEW_MARGIN), min(lines, top + height + self.PREVIEW_MARGIN)
+
+    def show_preview_window(self):
+        """Отрисовка в предпросмотре только видимых строк (как в поле заметки) с запасом.
+
+        Если окно строк лишь сдвинулось, дорисовываются и удаляются только
+        крайние строки; иначе окно отрисовывается заново. Строки окна
+        дозбираются перед отрисовкой, остальные — при простое.
+        """
+        top, first, last = self.preview_bounds()
+        self.preview_cache.parse_more(last, self.document.line_count, self.document.lines)
+
+        def render(a, b):
+            return self.preview_cache.render(a, b, self.document.lines)
+
+        window = self.preview_window
+        if window is None or first >= window[1] or last <= window[0]:
+            self.preview_text.delete("1.0", tk.END)
+            patch_text_lines(self.preview_text, (0, 0, render(first, last)), 0)
+        else:
+            old_first, old_last = window
+            count = old_last - old_first
+            if last > old_last:
+                patch_text_lines(self.preview_text, (count, count, render(old_last, last)), count)
+            elif last < old_last:
+                patch_text_lines(self.preview_text, (count - (old_last - last), count, []), count)
+            count = last - old_first
+            if first < old_first:
+                patch_text_lines(self.preview_text, (0, 0, render(first, old_first)), count)
+            elif first > old_first:
+                patch_text_lines(self.preview_text, (0, first - old_first, []), count)
+        self.preview_window = (first, last)
+        self.preview_text.yview(f"{top - first + 1}.0")
+        self.schedule_parse()
+
+    def schedule_parse(self):
+        if self.parse_job is None and self.preview_cache.parsed < self.document.line_count:
+            self.parse_job = self.root.after_idle(self.parse_in_idle)
+
+    def parse_in_idle(self):
+        """Порция разбора за окном предпросмотра; следующая — при следующем простое"""
+        self.parse_job = None
+        if self.placeholder_shown or self.dirty_lines.range is not None:
+            return  # сначала update_preview учтёт правки, он же продолжит разбор
+        self.preview_cache.parse_more(self.preview_cache.parsed + self.PREVIEW_IDLE_LINES,
+                                      self.document.line_count, self.document.lines)
+        self.schedule_parse()
+
+    def on_source_scroll(self, first, last):
+        """Поле заметки прокрутилось: предпросмотр догонит его при простое"""
+        if self.scroll_job is None:
+            self.scroll_job = self.root.after_idle(self.sync_preview_scroll)
+
+    def sync_preview_scroll(self):
+        self.scroll_job = None
+        if self.placeholder_shown:
+            return
+        if self.dirty_lines.range is not None:
+            self.update_preview()  # сначала учесть правки
+            return
+        self.preview_text.config(state="normal")
+        self.show_preview_window()
         self.preview_text.config(state="disabled")
 
+    def on_preview_wheel(self, event):
+        step = -3 if event.num == 4 or event.delta > 0 else 3
+        self.text_input.yview_scroll(step, "units")
+        return "break"
+
+    def rerender_preview(self):
+        """Перерисовка видимых строк (например, при смене правил форматирования)"""
+        self.preview_cache.bold_titles = self.bold_titles_var.get()
+        self.preview_window = None
+        self.update_preview()
+
+    def schedule_index(self):
+        if self.index_job is not None:
+            self.root.after_cancel(self.index_job)
+        self.index_job = self.root.after(self.INDEX_DELAY_MS, self.start_index_build)
+
+    def start_index_build(self):
+        """Перестройка индекса слов по снимку документа в фоновом потоке"""
+        self.index_job = None
+        if self.index_running:
+            self.index_stale = True  # перестроим ещё раз, когда закончится текущая
+            return
+        self.index_running = True
+        self.index_stale = False
+        edits_seen = len(self.word_index.edits)
+        generation = self.index_generation
+        future = self.executor.submit(WordIndex.build, self.document.snapshot())
+        future.add_done_callback(lambda f: self.index_results.put((generation, edits_seen, f)))
+        self.root.after(self.POLL_MS, self.poll_index)
+
+    def poll_index(self):
+        """Забрать готовый индекс (в потоке Tk)"""
+        try:
+            generation, edits_seen, future = self.index_results.get_nowait()
+        except queue.Empty:
+            self.root.after(self.POLL_MS, self.poll_index)
+            return
+        self.index_running = False
+        if generation == self.index_generation and not future.cancelled() and future.exception() is None:
+            self.word_index.replace(future.result(), edits_seen)
+        if self.index_stale:
+            self.start_index_build()
+
+    def find_in_note(self, event=None):
+        """Поиск строк со всеми словами запроса и их подсветка в заметке"""
+        self.text_input.tag_remove("found", "1.0", tk.END)
+        query = self.find_var.get()
+        words = set(WORD_RE.findall(query.lower()))
+        if not words:
+            self.find_label.config(text="")
+            return
+        found = self.word_index.find(query, self.document)
+        self.find_label.config(text=f"Найдено строк: {len(found)}")
+        for no in found[:self.MAX_HIGHLIGHTS]:
+            line = self.document.lines(no, no + 1)[0]
+            for m in WORD_RE.finditer(line):
+                if m.group().lower() in words:
+                    self.text_input.tag_add("found", f"{no + 1}.{m.start()}", f"{no + 1}.{m.end()}")
+        if found:
+            self.text_input.see(f"{found[0] + 1}.0")
+
     def apply_theme(self, event=None):
         theme = self.themes[self.theme_var.get()]
         self.preview_text.config(
             bg=theme["bg"],
             fg=theme["fg"],
-            insertbackground=theme["insert"],
-            state="normal"
+            insertbackground=theme["insert"]
         )
-        self.preview_text.config(state="disabled")
-        self.update_preview()  # обновляем текст при смене темы
 
     def clear_all(self):
         self.text_input.delete("1.0", tk.END)
@@ -106,7 +1192,10 @@ class NoteEditor:
 
 
 def main():
-    NoteEditor()
+    parser = argparse.ArgumentParser(description="Заметки с предпросмотром")
+    parser.add_argument("--workspace", default=DEFAULT_WORKSPACE, help="каталог с заметками (*.md)")
+    args = parser.parse_args()
+    NoteEditor(args.workspace)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,122 @@
+"""Замеры производительности исследователя чисел
+
+Запуск:
+    python benchmark.py batch [--count 1000000] [--chunk-size 65536]
+    python benchmark.py digits [--sizes 100 1000 10000 100000 1000000] [--str-max 100000]
+"""
+import argparse
+import io
+import sys
+import time
+from array import array
+from random import Random
+
+import lab5
+from lab5 import (BATCH_CHUNK, OUTPUT_FORMATS, NumberConverter, default_converters, digit_sum, int_to_decimal,
+                  read_numbers, run_batch)
+
+
+def make_ids(count: int, seed: int = 1) -> array:
+    """Синтетические идентификаторы в пределах int64"""
+    rng = Random(seed)
+    return array("q", (rng.randrange(1, 2**63) for _ in range(count)))
+
+
+def bench_batch(count: int, chunk_size: int):
+    converters = default_converters()
+    values = make_ids(count)
+    print(f"{count:,} чисел")
+    print(f"{'Преобразование':<26}  {'Цикл, с':>8}  {'Пакетом, с':>10}  {'Ускорение':>9}  Векторно")
+    print("─" * 70)
+    for conv in converters:
+        # Поэлементно — как в analyze_number
+        start = time.perf_counter()
+        [conv.convert(v) for v in values]
+        loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        conv.convert_many(values)
+        bulk = time.perf_counter() - start
+        vectorized = type(conv).convert_many is not NumberConverter.convert_many
+        print(f"{conv.get_format_name():<26}  {loop:>8.2f}  {bulk:>10.3f}  {loop / bulk:>8.1f}x  "
+              f"{'да' if vectorized else 'нет'}")
+
+    print(f"\nrun_batch, пачки по {chunk_size:,}")
+    print(f"{'Формат':<8}  {'Всего, с':>9}  {'Запись, с':>10}  {'Чисел/с':>12}")
+    print("─" * 46)
+    for fmt in OUTPUT_FORMATS:
+        out = io.StringIO()
+        start = time.perf_counter()
+        _, timings = run_batch(values, converters, out, fmt, chunk_size)
+        elapsed = time.perf_counter() - start
+        print(f"{fmt:<8}  {elapsed:>9.2f}  {timings['write']:>10.2f}  {count / elapsed:>12,.0f}")
+
+    # Из текста: пачки read_numbers сразу идут в анализ либо (как раньше)
+    # разворачиваются в поток чисел и снова собираются в пачки
+    text = "".join(f"{v}\n" for v in values)
+    print(f"\nИз текста ({len(text) / 2**20:.1f} МБ), CSV")
+    for label, chunked in (("пачками", True), ("по числу", False)):
+        chunks = read_numbers([io.StringIO(text)], chunk_size)
+        numbers = chunks if chunked else (v for chunk in chunks for v in chunk)
+        start = time.perf_counter()
+        run_batch(numbers, converters, io.StringIO(), "csv", chunk_size, chunked=chunked)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<9} {elapsed:>6.2f} с  {count / elapsed:>12,.0f} чисел/с")
+
+
+def timed(job):
+    start = time.perf_counter()
+    result = job()
+    return result, time.perf_counter() - start
+
+
+def bench_digits(sizes, str_max: int):
+    """Сумма цифр и десятичная запись огромных чисел: прежний путь через str()
+    (со снятым ограничением на длину) против деления степенями 10^k"""
+    rng = Random(1)
+    sys.set_int_max_str_digits(0)
+    print(f"str() считается только до {str_max:,} цифр; «первый» — с расчётом степеней и обратных")
+    print(f"{'Цифр':>9}  {'str+sum, с':>10}  {'digit_sum первый, с':>19}  {'digit_sum, с':>12}  "
+          f"{'str, с':>8}  {'int_to_decimal, с':>17}  {'n & 1, мкс':>10}")
+    print("─" * 100)
+    for digits in sizes:
+        number = rng.randrange(10 ** (digits - 1), 10 ** digits)
+        lab5._POWERS.clear()
+        lab5._INVERSES.clear()
+        total, first = timed(lambda: digit_sum(number))
+        _, cached = timed(lambda: digit_sum(number))
+        text, to_decimal = timed(lambda: int_to_decimal(number))
+        _, parity = timed(lambda: number & 1)
+        old = old_str = "—"
+        if digits <= str_max:
+            reference, seconds = timed(lambda: sum(int(d) for d in str(abs(number))))
+            old = f"{seconds:.3f}"
+            expected, seconds = timed(lambda: str(number))
+            old_str = f"{seconds:.3f}"
+            assert reference == total and expected == text
+        print(f"{digits:>9,}  {old:>10}  {first:>19.3f}  {cached:>12.3f}  {old_str:>8}  "
+              f"{to_decimal:>17.3f}  {parity * 1e6:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки исследователя чисел")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch", help="convert_many и пакетный вывод CSV / NDJSON")
+    batch.add_argument("--count", type=int, default=1_000_000)
+    batch.add_argument("--chunk-size", type=int, default=BATCH_CHUNK)
+
+    digits = commands.add_parser("digits", help="сумма цифр и десятичная запись огромных чисел")
+    digits.add_argument("--sizes", type=int, nargs="+", default=[10**2, 10**3, 10**4, 10**5, 10**6])
+    digits.add_argument("--str-max", type=int, default=100_000,
+                        help="до скольки цифр замерять прежний путь через str()")
+
+    args = parser.parse_args()
+    if args.command == "batch":
+        bench_batch(args.count, args.chunk_size)
+    elif args.command == "digits":
+        bench_digits(args.sizes, args.str_max)
+
+
+if __name__ == "__main__":
+    main()
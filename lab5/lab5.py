@@ -1,10 +1,55 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import abc
+import argparse
+import sys
+import time
+from array import array
+from functools import lru_cache
+from itertools import islice
+from json.encoder import encode_basestring
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple, Type
+
+try:
+    import numpy as np
+except ImportError:  # convert_many работает и без numpy, но поэлементно
+    np = None
+
+
+def as_ints(values):
+    """Последовательность чисел как Python int: numpy-массив превращается в список
+    (иначе map(bin, ...) и т.п. шли бы через numpy-скаляры)"""
+    if np is not None and isinstance(values, np.ndarray):
+        return values.tolist()
+    return values
+
+
+def int_array(values):
+    """numpy-массив целых, если пачку можно обработать векторно, иначе None"""
+    if np is None or not len(values):
+        return None
+    if isinstance(values, np.ndarray):
+        return values if values.dtype.kind in "iu" else None
+    if isinstance(values, array) and values.typecode in "bBhHiIlLqQ":
+        return np.frombuffer(values, dtype=values.typecode)
+    return None
+
+
+# Реестр преобразователей по ключу (ключ key класса). Подклассы NumberConverter
+# с key попадают сюда сами; ключ же — имя столбца в пакетном выводе
+CONVERTERS: Dict[str, Type["NumberConverter"]] = {}
 
 
 class NumberConverter(abc.ABC):
     """Абстрактный класс для преобразования числа в разные форматы"""
+    # Имя в реестре CONVERTERS и столбца в CSV/NDJSON; None — не регистрировать
+    key: Optional[str] = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "key" in cls.__dict__ and cls.key is not None:
+            CONVERTERS[cls.key] = cls
+
     @abc.abstractmethod
     def get_format_name(self) -> str:
         pass
@@ -17,8 +62,15 @@ class NumberConverter(abc.ABC):
     def convert(self, number: int) -> str:
         pass
 
+    def convert_many(self, values) -> List[str]:
+        """Строки для пачки чисел (список, array или numpy-массив) — те же,
+        что дал бы convert для каждого числа"""
+        return [self.convert(v) for v in as_ints(values)]
+
 
 class BinaryConverter(NumberConverter):
+    key = "bin"
+
     def get_format_name(self) -> str:
         return "Двоичная система"
 
@@ -26,10 +78,12 @@ class BinaryConverter(NumberConverter):
         return "0b"
 
     def convert(self, number: int) -> str:
-        return bin(number)[2:]  # без префикса 0b
+        return format(number, "b")  # без префикса 0b, знак — перед цифрами
 
 
 class OctalConverter(NumberConverter):
+    key = "oct"
+
     def get_format_name(self) -> str:
         return "Восьмеричная система"
 
@@ -37,10 +91,12 @@ class OctalConverter(NumberConverter):
         return "0o"
 
     def convert(self, number: int) -> str:
-        return oct(number)[2:]
+        return format(number, "o")
 
 
 class HexConverter(NumberConverter):
+    key = "hex"
+
     def get_format_name(self) -> str:
         return "Шестнадцатеричная система"
 
@@ -48,11 +104,165 @@ class HexConverter(NumberConverter):
         return "0x"
 
     def convert(self, number: int) -> str:
-        return hex(number)[2:].upper()
+        return format(number, "X")
+
+
+# Десятичная запись больших чисел. str() и int() с Python 3.11 отказываются
+# работать с числами длиннее sys.get_int_max_str_digits() (4300 цифр), а
+# до этого предела тратят квадратичное время. Здесь число делится пополам
+# на степени 10^(LEAF_DIGITS·2^i), пока куски не станут короче LEAF_DIGITS
+# цифр; деление — умножением на заранее посчитанное обратное (Барретт),
+# поэтому всё упирается в быстрое (карацубовское) умножение int
+LEAF_DIGITS = 256
+# Ниже этого размера делителя (в битах) встроенный divmod быстрее Барретта
+BARRETT_MIN_BITS = 8192
+# Сумма цифр считается кусками по DIGIT_CHUNK цифр по готовой таблице
+DIGIT_CHUNK = 4
+CHUNK_BASE = 10 ** DIGIT_CHUNK
+CHUNK_DIGIT_SUMS = bytes(sum(map(int, str(i))) for i in range(CHUNK_BASE))
+
+_POWERS: List[int] = []       # 10^(LEAF_DIGITS·2^i)
+_INVERSES: List[int] = []     # ⌊2^(2·b) / степень⌋, b — битовая длина степени
+
+
+def decimal_power(level: int) -> int:
+    """10^(LEAF_DIGITS·2^level); степени считаются один раз и запоминаются"""
+    while len(_POWERS) <= level:
+        _POWERS.append(_POWERS[-1] ** 2 if _POWERS else 10 ** LEAF_DIGITS)
+    return _POWERS[level]
+
+
+def _inverse(level: int) -> int:
+    """⌊2^(2·b) / decimal_power(level)⌋: квадрат обратного предыдущего уровня,
+    уточнённый шагом Ньютона и доведённый до точного по остатку"""
+    while len(_INVERSES) <= level:
+        i = len(_INVERSES)
+        power = decimal_power(i)
+        shift = 2 * power.bit_length()
+        if i == 0:
+            _INVERSES.append((1 << shift) // power)
+            continue
+        prev_shift = 2 * decimal_power(i - 1).bit_length()
+        # 1/p² = (1/p)²: погрешность после возведения в квадрат — порядка
+        # квадратного корня из результата, шаг Ньютона оставляет единицы,
+        # а их убирает поправка по остатку (иначе ошибка росла бы от уровня
+        # к уровню)
+        inverse = (_INVERSES[-1] ** 2) >> (2 * prev_shift - shift)
+        inverse += (inverse * ((1 << shift) - power * inverse)) >> shift
+        remainder = (1 << shift) - power * inverse
+        while remainder < 0:
+            inverse -= 1
+            remainder += power
+        while remainder >= power:
+            inverse += 1
+            remainder -= power
+        _INVERSES.append(inverse)
+    return _INVERSES[level]
+
+
+def _divmod_power(n: int, level: int) -> Tuple[int, int]:
+    """divmod(n, decimal_power(level)) для 0 <= n < decimal_power(level)²"""
+    power = decimal_power(level)
+    bits = power.bit_length()
+    if bits < BARRETT_MIN_BITS:
+        return divmod(n, power)
+    quotient = ((n >> (bits - 1)) * _inverse(level)) >> (bits + 1)
+    remainder = n - quotient * power
+    while remainder < 0:
+        quotient -= 1
+        remainder += power
+    while remainder >= power:
+        quotient += 1
+        remainder -= power
+    return quotient, remainder
+
+
+def _split_leaves(n: int, level: int, leaves: List[int], leading: bool):
+    if level < 0:
+        leaves.append(n)
+        return
+    if leading and n < decimal_power(level):
+        # У старшего края нет смысла делить — получились бы нулевые куски
+        _split_leaves(n, level - 1, leaves, True)
+        return
+    high, low = _divmod_power(n, level)
+    _split_leaves(high, level - 1, leaves, leading)
+    _split_leaves(low, level - 1, leaves, False)
+
+
+def decimal_leaves(n: int) -> List[int]:
+    """Куски десятичной записи n >= 0 по LEAF_DIGITS цифр, от старших к младшим.
+    Старший кусок может быть короче, остальные дополняются нулями слева"""
+    # Уровень, на котором n < decimal_power(level)²: сравнение по битовой
+    # длине — чтобы не считать лишнюю степень
+    level = 0
+    while n.bit_length() > 2 * decimal_power(level).bit_length() - 2:
+        level += 1
+    leaves = []
+    _split_leaves(n, level, leaves, True)
+    return leaves
+
+
+def int_to_decimal(n: int) -> str:
+    """str(n) без ограничения на длину и за субквадратичное время"""
+    if abs(n) < decimal_power(0):
+        return str(n)
+    leaves = decimal_leaves(abs(n))
+    return ("-" if n < 0 else "") + str(leaves[0]) + "".join(
+        f"{leaf:0{LEAF_DIGITS}d}" for leaf in leaves[1:])
+
+
+def parse_int(text: str) -> int:
+    """int(text) без ограничения на длину: длинная запись из цифр собирается
+    половинами на тех же степенях 10^(LEAF_DIGITS·2^i)"""
+    raw = text.strip()
+    digits = raw[1:] if raw[:1] in ("+", "-") else raw
+    if len(digits) <= LEAF_DIGITS or not (digits.isascii() and digits.isdigit()):
+        return int(raw)
+    value = _digits_to_int(digits)
+    return -value if raw[0] == "-" else value
+
+
+def _digits_to_int(digits: str) -> int:
+    if len(digits) <= LEAF_DIGITS:
+        return int(digits)
+    level = 0
+    while LEAF_DIGITS << (level + 1) < len(digits):
+        level += 1
+    split = len(digits) - (LEAF_DIGITS << level)
+    return _digits_to_int(digits[:split]) * decimal_power(level) + _digits_to_int(digits[split:])
+
+
+def digit_sum(n: int) -> int:
+    """Сумма десятичных цифр |n| без строки: куски decimal_leaves разбираются
+    по DIGIT_CHUNK цифр через таблицу CHUNK_DIGIT_SUMS"""
+    table = CHUNK_DIGIT_SUMS
+    total = 0
+    for leaf in decimal_leaves(abs(n)):
+        while leaf:
+            leaf, chunk = divmod(leaf, CHUNK_BASE)
+            total += table[chunk]
+    return total
+
+
+# Для int64 сумма цифр не больше 171, и все сочетания (около тысячи) помещаются
+# в кэш; у огромных чисел суммы цифр почти не повторяются, поэтому кэш ограничен
+PROPERTIES_CACHE_SIZE = 2048
+
+
+@lru_cache(maxsize=PROPERTIES_CACHE_SIZE)
+def describe_properties(sign: int, odd: bool, digit_sum: int) -> str:
+    """Текст анализа по знаку (-1, 0, 1), нечётности и сумме цифр. Для чисел
+    в пределах int64 различных сочетаний немного, поэтому строки кэшируются"""
+    sign_text = "положительное" if sign > 0 else "отрицательное" if sign < 0 else "ноль"
+    parity = "нечётное" if odd else "чётное"
+    return f"{sign_text}, {parity}, сумма цифр = {digit_sum}"
 
 
 class PropertiesAnalyzer(NumberConverter):
     """Анализ свойств числа (чётность, сумма цифр и т.д.)"""
+    key = "props"
+
     def get_format_name(self) -> str:
         return "Анализ свойств"
 
@@ -60,10 +270,31 @@ class PropertiesAnalyzer(NumberConverter):
         return ""
 
     def convert(self, number: int) -> str:
-        parity = "чётное" if number % 2 == 0 else "нечётное"
-        digit_sum = sum(int(d) for d in str(abs(number)))
-        sign = "положительное" if number > 0 else "отрицательное" if number < 0 else "ноль"
-        return f"{sign}, {parity}, сумма цифр = {digit_sum}"
+        sign = (number > 0) - (number < 0)
+        # Чётность — по младшему биту (у отрицательных в Python тоже верно)
+        return describe_properties(sign, number & 1 == 1, digit_sum(number))
+
+    def convert_many(self, values) -> List[str]:
+        """С numpy знак, чётность и сумма цифр считаются для всей пачки
+        (сумма — делением на 10, пока есть ненулевые), а текст берётся по
+        коду сочетания — каждое различное сочетание форматируется один раз"""
+        ints = int_array(values)
+        if ints is None:
+            return super().convert_many(values)
+        magnitude = ints.astype(np.uint64)
+        if ints.dtype.kind == "i":
+            negative = ints < 0
+            # Модуль в uint64: так и -2**63 не переполняется
+            magnitude[negative] = np.negative(magnitude[negative])
+        digit_sums = np.zeros(len(ints), dtype=np.int64)
+        while magnitude.any():
+            magnitude, digits = np.divmod(magnitude, np.uint64(10))
+            digit_sums += digits.astype(np.int64)
+        codes = (digit_sums * 2 + (ints & 1).astype(np.int64)) * 3 + np.sign(ints).astype(np.int64) + 1
+        distinct, inverse = np.unique(codes, return_inverse=True)
+        texts = [describe_properties(code % 3 - 1, code // 3 % 2 == 1, code // 6)
+                 for code in distinct.tolist()]
+        return [texts[i] for i in inverse.tolist()]
 
 
 class NumberExplorerGUI:
@@ -73,12 +304,7 @@ class NumberExplorerGUI:
         self.root.geometry("420x380")
         self.root.configure(bg="#f5f7fa")
 
-        self.converters = [
-            BinaryConverter(),
-            OctalConverter(),
-            HexConverter(),
-            PropertiesAnalyzer()
-        ]
+        self.converters = default_converters()
 
         self.create_interface()
         self.root.mainloop()
@@ -109,12 +335,12 @@ class NumberExplorerGUI:
 
     def analyze_number(self):
         try:
-            num = int(self.number_var.get())
+            num = parse_int(self.number_var.get())
 
             self.result_text.config(state="normal")
             self.result_text.delete("1.0", tk.END)
 
-            self.result_text.insert(tk.END, f"Число: {num}\n")
+            self.result_text.insert(tk.END, f"Число: {int_to_decimal(num)}\n")
             self.result_text.insert(tk.END, "─" * 40 + "\n")
 
             for conv in self.converters:
@@ -122,6 +348,8 @@ class NumberExplorerGUI:
                     result = conv.convert(num)
                     prefix = conv.get_prefix()
                     name = conv.get_format_name()
+                    if prefix and result.startswith("-"):  # -0xFF, а не 0x-FF
+                        prefix, result = "-" + prefix, result[1:]
                     self.result_text.insert(tk.END, f"{name:<25} → {prefix}{result}\n")
                 except Exception as e:
                     self.result_text.insert(tk.END, f"{conv.get_format_name():<25} → Ошибка: {e}\n")
@@ -134,8 +362,209 @@ class NumberExplorerGUI:
             messagebox.showerror("Неизвестная ошибка", str(e))
 
 
+def default_converters() -> List[NumberConverter]:
+    return [cls() for cls in CONVERTERS.values()]
+
+
+def column_name(conv: NumberConverter) -> str:
+    return conv.key or type(conv).__name__
+
+
+# Чисел за одну пачку пакетного режима: память ограничена размером пачки
+BATCH_CHUNK = 65536
+OUTPUT_FORMATS = ("csv", "ndjson")
+
+ErrorCallback = Callable[[int, str, str], None]
+
+
+def iter_chunks(values, chunk_size: int = BATCH_CHUNK) -> Iterator:
+    """Пачки по chunk_size чисел. Последовательности (список, array, numpy)
+    режутся срезами, прочие итерируемые читаются по частям в array('q')
+    (или в список, если числа не помещаются в int64)"""
+    if hasattr(values, "__len__") and hasattr(values, "__getitem__"):
+        for start in range(0, len(values), chunk_size):
+            yield values[start:start + chunk_size]
+        return
+    iterator = iter(values)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        try:
+            yield array("q", chunk)
+        except (OverflowError, TypeError):
+            yield chunk
+
+
+def analyze_many(values, converters: Sequence[NumberConverter], chunk_size: int = BATCH_CHUNK,
+                 timings: Optional[Dict[str, float]] = None,
+                 chunked: bool = False) -> Iterator[Tuple[object, List[List[str]]]]:
+    """Все преобразователи по пачкам: для каждой пачки — (пачка, столбцы
+    результатов в порядке converters). chunked — values уже разбиты на
+    пачки (например, read_numbers). В timings копится время каждого
+    преобразователя по имени столбца"""
+    for chunk in values if chunked else iter_chunks(values, chunk_size):
+        columns = []
+        for conv in converters:
+            start = time.perf_counter()
+            columns.append(conv.convert_many(chunk))
+            if timings is not None:
+                name = column_name(conv)
+                timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+        yield chunk, columns
+
+
+def csv_values(column) -> List[str]:
+    """Значения столбца для CSV. Проверка на запятые, кавычки и переводы
+    строк делается сразу по всему столбцу: обычно кавычки не нужны вовсе,
+    а если нужны — берутся в кавычки все значения столбца"""
+    if not column or not isinstance(column[0], str):
+        return list(map(str, column))
+    joined = "".join(column)
+    if not any(ch in joined for ch in ',"\r\n'):
+        return column
+    return ['"' + value.replace('"', '""') + '"' for value in column]
+
+
+def decimal_strings(numbers) -> List[str]:
+    """Десятичные записи пачки; длинные (больше 4300 цифр) — через int_to_decimal"""
+    try:
+        return list(map(str, numbers))
+    except ValueError:
+        return list(map(int_to_decimal, numbers))
+
+
+def json_values(column) -> List[str]:
+    """Значения столбца, уже закодированные для JSON"""
+    if column and isinstance(column[0], str):
+        return list(map(encode_basestring, column))
+    return list(map(str, column))
+
+
+def run_batch(values, converters: Sequence[NumberConverter], out: TextIO, fmt: str = "csv",
+              chunk_size: int = BATCH_CHUNK, chunked: bool = False) -> Tuple[int, Dict[str, float]]:
+    """Пакетный анализ без GUI: строка CSV (с заголовком) или объект NDJSON
+    на каждое число (chunked — как в analyze_many). Возвращает количество
+    чисел и время по столбцам (преобразователи и запись — «write»)"""
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Неизвестный формат вывода: {fmt}")
+    names = ["number"] + [column_name(c) for c in converters]
+    timings = {name: 0.0 for name in names[1:]}
+    write_time = 0.0
+    count = 0
+    # Шаблон строки: значения подставляются уже закодированными, строка
+    # собирается одной подстановкой вместо поэлементного csv.writer / json.dumps
+    if fmt == "csv":
+        out.write(",".join(csv_values(names)) + "\n")
+        template, encode = ",".join(["%s"] * len(names)) + "\n", csv_values
+    else:
+        template = "{" + ", ".join(encode_basestring(n).replace("%", "%%") + ": %s" for n in names) + "}\n"
+        encode = json_values
+    for chunk, columns in analyze_many(values, converters, chunk_size, timings, chunked):
+        start = time.perf_counter()
+        encoded = [decimal_strings(as_ints(chunk))] + [encode(c) for c in columns]
+        out.write("".join(template % row for row in zip(*encoded)))
+        write_time += time.perf_counter() - start
+        count += len(chunk)
+    timings["write"] = write_time
+    return count, timings
+
+
+def report_throughput(count: int, timings: Dict[str, float], file: TextIO = sys.stderr):
+    """Время и скорость каждого преобразователя (и записи)"""
+    print(f"{count:,} чисел", file=file)
+    print(f"{'Столбец':<10}  {'Время, с':>9}  {'Чисел/с':>14}", file=file)
+    print("─" * 37, file=file)
+    for name, elapsed in timings.items():
+        print(f"{name:<10}  {elapsed:>9.3f}  {count / max(elapsed, 1e-9):>14,.0f}", file=file)
+
+
+def parse_chunk(lines: Sequence[str], first_no: int, on_error: Optional[ErrorCallback] = None):
+    """Разбор пачки строк с целыми числами (по одному на строку).
+
+    Пустые строки пропускаются, для некорректных вызывается
+    on_error(номер строки, строка, причина). Возвращает array('q') или,
+    если числа не помещаются в int64, список.
+    """
+    try:
+        return array("q", map(int, lines))
+    except (ValueError, OverflowError):
+        pass
+    numbers = []
+    for i, line in enumerate(lines):
+        raw = line.strip()
+        if not raw:
+            continue
+        try:
+            numbers.append(parse_int(raw))
+        except ValueError:
+            if on_error is not None:
+                on_error(first_no + i, line.rstrip("\n"), "введите корректное целое число")
+    try:
+        return array("q", numbers)
+    except OverflowError:
+        return numbers
+
+
+def read_numbers(sources: Iterable[TextIO], chunk_lines: int = BATCH_CHUNK,
+                 on_error: Optional[ErrorCallback] = None) -> Iterator:
+    """Пачки чисел (как из parse_chunk) из текстовых источников, читаемых
+    пачками строк: готовы для analyze_many / run_batch с chunked=True"""
+    line_no = 0
+    for source in sources:
+        while True:
+            lines = list(islice(source, chunk_lines))
+            if not lines:
+                break
+            numbers = parse_chunk(lines, line_no + 1, on_error)
+            if len(numbers):
+                yield numbers
+            line_no += len(lines)
+
+
+def report_line_error(line_no: int, line: str, reason: str):
+    print(f"Строка {line_no}: {reason}: {line!r}", file=sys.stderr)
+
+
 def main():
-    NumberExplorerGUI()
+    parser = argparse.ArgumentParser(
+        description="Исследователь чисел. Без аргументов — графический интерфейс.")
+    parser.add_argument("files", nargs="*", help="файлы с целыми числами, по одному на строку; - — stdin")
+    parser.add_argument("--converters", default=",".join(CONVERTERS),
+                        help="преобразователи через запятую: " + ", ".join(CONVERTERS))
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="csv")
+    parser.add_argument("-o", "--output", help="файл результата (по умолчанию stdout)")
+    parser.add_argument("--chunk-size", type=int, default=BATCH_CHUNK)
+    args = parser.parse_args()
+
+    if not args.files:
+        NumberExplorerGUI()
+        return
+
+    keys = [k.strip() for k in args.converters.split(",") if k.strip()]
+    unknown = [k for k in keys if k not in CONVERTERS]
+    if unknown or not keys:
+        parser.error("неизвестные преобразователи: " + ", ".join(unknown) if unknown
+                     else "не заданы преобразователи")
+    converters = [CONVERTERS[k]() for k in keys]
+
+    def sources():
+        for name in args.files:
+            if name == "-":
+                yield sys.stdin
+            else:
+                with open(name, encoding="utf-8") as f:
+                    yield f
+
+    numbers = read_numbers(sources(), args.chunk_size, report_line_error)
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        count, timings = run_batch(numbers, converters, out, args.format, args.chunk_size, chunked=True)
+    finally:
+        if args.output:
+            out.close()
+    sys.stdout.flush()
+    report_throughput(count, timings)
 
 
 if __name__ == "__main__":